@@ -1,58 +1,78 @@
-from flask import Flask, request, jsonify, make_response
+from werkzeug.middleware.proxy_fix import ProxyFix
+from flask import Flask, Blueprint, current_app, request, jsonify, make_response, Response, stream_with_context, url_for
 import json 
-import requests
 from dotenv import load_dotenv
 load_dotenv()
 from datetime import datetime, timezone
-from flask_sqlalchemy import SQLAlchemy
-from util.validations import Validation
+from util.validations import Validation, credential_cache
 from util.encrypt import Encryption
-from util.db import Users, Assignments, db, Submissions
-import boto3
+from util.db import Assignments, db, Submissions, SubmissionJobs, SubmissionAttempts
+from util.submission_worker import SubmissionWorker
+from util.sns_publisher import SNSBatchPublisher
+from util.pagination import Pagination, MAX_PAGE_SIZE
+from util.seed import seed_users, SeedError
+from util.db_pool import engine_options
+from util.migrations import migrate
+from util.response_cache import ResponseCache, CachedResponse
+from util.schema import ASSIGNMENT_SCHEMA, SUBMISSION_SCHEMA
+from util.queries import Queries, ASSIGNMENT_COLUMNS, ASSIGNMENT_KEYS
+from util.health import HealthChecker
+from util.admission import AdmissionController
+from util.replicas import ReplicaPool, ReplicaRouter, replica_uris, used_replica
+from util.serialization import FastJSONProvider, dumps, encode_rows
 import os 
-from sqlalchemy.exc import SQLAlchemyError
-import psycopg2
+from sqlalchemy import tuple_, update, delete, bindparam, exists, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 import uuid 
-import pandas as pd
-import statsd
+from util.metrics import metrics, init_app as init_metrics
 from app_logging import logger
 
 
-app = Flask(__name__)
+credential_cache.statsd_client = metrics
 
-app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql+psycopg2://{os.getenv('DBUSER')}:{os.getenv('DBPASS')}@{os.getenv('DBHOST')}:{os.getenv('DBPORT')}/{os.getenv('DATABASE')}"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+sns_publisher = SNSBatchPublisher(
+    window=float(os.getenv('SNS_BATCH_WINDOW', 0.05)),
+    max_queue=int(os.getenv('SNS_BUFFER_SIZE', 1000))
+)
 
-db.init_app(app)
+# Single-assignment GET responses; set response_cache.shared to a
+# SharedCacheBackend to share entries between worker processes
+response_cache = ResponseCache(
+    maxsize=int(os.getenv('RESPONSE_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL', 30))
+)
 
-with app.app_context():
-    db.create_all()
+bp = Blueprint('api', __name__)
 
-c = statsd.StatsClient('localhost', 8125)
-
-@app.route('/healthz', methods = ['GET'])
+@bp.route('/healthz', methods = ['GET'])
 def healthcheck():
-    c.incr('healthz_counter')
+    metrics.incr('healthz_counter')
     if request.args:
         logger.error("Query parameters are not allowed", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 400})
         return jsonify({"message": "Query parameters are not allowed"}), 400
-    try:
-        if request.data:
-            logger.error("Request body should be empty", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 400})
-            return jsonify({"message": "Request body should be empty"}), 400
-        
-        db.session.execute('SELECT 1')
-        res = make_response(jsonify({"message" : "Endpoint is healthy"}), 200)
-        logger.info("healthz is working fine", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 200})
+    if request.data:
+        logger.error("Request body should be empty", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 400})
+        return jsonify({"message": "Request body should be empty"}), 400
 
-    except Exception as e:
-        res = make_response(jsonify({f"message" : {e}}), 503)
-        logger.error("healthz is not working server unavailable", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 503})
-    
+    # Answered from the background checker's last report; no DB round trip
+    report = current_app.extensions['health_checker'].current()
+    res = json_response(report.body, 200 if report.healthy else 503)
+    res.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, proxy-revalidate'
+    return res
+
+@bp.route('/healthz/deep', methods = ['GET'])
+def deep_healthcheck():
+    metrics.incr('healthz_deep_counter')
+    # Runs every check now and reports each dependency with its latency
+    report = current_app.extensions['health_checker'].run_checks()
+    status = 200 if report.healthy else 503
+    logger.info(f"Deep health check: {report.detail['status']}", extra={'method': 'GET', 'uri': '/healthz/deep', 'statusCode': status})
+    res = json_response(dumps(report.detail), status)
     res.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, proxy-revalidate'
     return res
 
-@app.route('/healthz', methods = ['POST','PUT','DELETE','PATCH'])
+@bp.route('/healthz', methods = ['POST','PUT','DELETE','PATCH'])
 def check():
     res = make_response(jsonify({"message" : "Method not allowed"}), 405)
     logger.error("Change the method to GET (Method not allowed)", extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 405})
@@ -61,34 +81,19 @@ def check():
 def add_users():
     file_path = os.getenv('CSV_PATH', 'users.csv')  # Defaulting if not set  
     try:
-        # Read the CSV file into a DataFrame
-        df = pd.read_csv(file_path)
-
-        # Iterate over DataFrame rows
-        for index, row in df.iterrows():
-            if not all([row['first_name'], row['last_name'], row['email'], row['password']]):
-                logger.error( "Enter Valid User data", extra={'statusCode': 400})
-                return jsonify(message='Enter Valid User data'), 400
-
-            if Users.query.filter_by(email=row['email']).first():
-                logger.info("User with the same email already exists")
-                continue
+        result = seed_users(
+            file_path,
+            chunksize=int(os.getenv('SEED_CHUNK_SIZE', 1000)),
+            workers=int(os.getenv('SEED_WORKERS', 0)) or None
+        )
+        logger.info("Users added successfully", extra={'statusCode': 201})
+        print("Users added successfully", result)
 
-            hashed_password = Encryption.encrypt(row['password'])
-            new_user = Users(
-                first_name=row['first_name'],
-                last_name=row['last_name'],
-                email=row['email'],
-                password=hashed_password
-            )
-            db.session.add(new_user)
-            
+        return jsonify({"message" : "Users added successfully", **result}), 201
 
-        db.session.commit()
-        logger.info("Users added successfully", extra={'statusCode': 201})
-        print("Users added successfully")
-        
-        return jsonify({"message" : "Users added successfully"}), 201
+    except SeedError as e:
+        logger.error(str(e), extra={'statusCode': 400})
+        return jsonify(message=str(e)), 400
 
     except Exception as e:
         logger.error(f'Server error: {e}', extra={'statusCode': 500})
@@ -96,9 +101,9 @@ def add_users():
 
 api_version = "v3"
   
-@app.route(f'/{api_version}/assignments', methods = ['POST'])
+@bp.route(f'/{api_version}/assignments', methods = ['POST'])
 def create_assignment():
-    c.incr('Create_assignments')
+    metrics.incr('Create_assignments')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authentication required", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 401})
@@ -114,45 +119,31 @@ def create_assignment():
         logger.error("Invalid credentials-Unauthorised", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 401})
         return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
     
-    data = request.get_json()
-    message = Validation.isAssignDataValid(data)
+    payload, message = ASSIGNMENT_SCHEMA.parse(request.get_json())
     if message != "":
         logger.error(message, extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
         return jsonify({"message" : message}), 400
     
-    name = data.get("name")
-    points = data.get("points")
-    num_of_attempts = data.get("num_of_attempts")
-    deadline = data.get("deadline")
-    assign = Assignments.query.filter_by(name=name).first()
-    if assign:
-        logger.error("Assignment already exist", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
-        return jsonify({"message":"Assignment already exist"}), 400
-
-    new_assign = Assignments(name=name, points=points, num_of_attempts=num_of_attempts, deadline=deadline, owner_user_id=user.id)
-    db.session.add(new_assign)
     try:
-
+        # The unique name index decides conflicts: one INSERT ... ON CONFLICT DO NOTHING
+        new_assign = Queries.create_assignment(user.id, payload)
+        if new_assign is None:
+            db.session.rollback()
+            logger.error("Assignment already exist", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
+            return jsonify({"message":"Assignment already exist"}), 400
         db.session.commit()
-        schema = {
-            "id": new_assign.id,
-            "name": new_assign.name,
-            "points": new_assign.points,
-            "num_of_attempts": new_assign.num_of_attempts,
-            "deadline": new_assign.deadline,
-            "assignment_created": new_assign.assignment_created,
-            "assignment_updated": new_assign.assignment_updated
-        } 
-        logger.info(schema, extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 201})
-        return schema,201
+
+        body = dumps(assignment_schema(new_assign))
+        logger.info("Assignment created", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 201, 'body': body})
+        return json_response(body, 201)
     except SQLAlchemyError as e:
         db.session.rollback()  # Roll back the session on error
         logger.error(f"Database error, could not create assignment - {e}", extra={'method': 'POST', 'uri': f'/{api_version}/assignments', 'statusCode': 500})
         return jsonify({"message": f"Database error, could not create assignment - {e}"}), 500
     
-@app.route(f'/{api_version}/assignments', methods = ['GET'])
+@bp.route(f'/{api_version}/assignments', methods = ['GET'])
 def get_assignments():
-    c.incr('GET_assignment_list')
+    metrics.incr('GET_assignment_list')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authentication required", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 401})
@@ -172,34 +163,86 @@ def get_assignments():
         logger.error("Request body should be empty", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
         return jsonify({"message": "Request body should be empty"}), 400
     
+    limit = Pagination.parse_limit(request.args.get('limit'))
+    if limit is None:
+        logger.error(f"limit must be an integer between 1 and {MAX_PAGE_SIZE}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
+        return jsonify({"message": f"limit must be an integer between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    cursor = request.args.get('cursor')
+    after = None
+    if cursor:
+        after = Pagination.decode_cursor(cursor)
+        if after is None:
+            logger.error("Invalid cursor", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    stream = request.args.get('stream')
+    if stream not in (None, 'json', 'ndjson'):
+        logger.error("stream must be json or ndjson", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 400})
+        return jsonify({"message": "stream must be json or ndjson"}), 400
+
     try:
-        assignments = Assignments.query.all() 
-        if not assignments:
+        # Only the response columns are selected; rows are plain tuples
+        query = db.session.query(*ASSIGNMENT_COLUMNS).order_by(Assignments.assignment_created, Assignments.id)
+        if after:
+            query = query.filter(tuple_(Assignments.assignment_created, Assignments.id) > after)
+
+        if stream:
+            # Server-side cursor: rows are fetched and written out in batches so
+            # memory stays flat regardless of table size
+            rows = query.execution_options(stream_results=True).yield_per(500)
+            if 'limit' in request.args:
+                rows = rows.limit(limit)
+            logger.info(f"Streaming assignments as {stream}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 200})
+            mimetype = 'application/x-ndjson' if stream == 'ndjson' else 'application/json'
+            return Response(stream_with_context(stream_assignments(rows, stream)), mimetype=mimetype)
+
+        # Fetch one extra row to know whether another page exists
+        assignments = query.limit(limit + 1).all()
+        if not assignments and not cursor:
             logger.error("Assignment not found", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 404})
             return jsonify({"message": "Assignment not found"}), 404
-         
-        schema = []
-        for assignment in assignments:
-            result ={
-            "id": assignment.id,  
-            "name": assignment.name,
-            "points": assignment.points,
-            "num_of_attempts": assignment.num_of_attempts,
-            "deadline": assignment.deadline.isoformat(), 
-            "assignment_created": assignment.assignment_created.isoformat(),
-            "assignment_updated": assignment.assignment_updated.isoformat()
-         }
-            schema.append(result)
-        logger.info(schema, extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 200})
-        return schema,200
+
+        has_more = len(assignments) > limit
+        assignments = assignments[:limit]
+        res = json_response(encode_rows(assignments, ASSIGNMENT_KEYS), 200)
+        if has_more:
+            last = assignments[-1]
+            next_cursor = Pagination.encode_cursor(last.assignment_created, last.id)
+            res.headers['X-Next-Cursor'] = next_cursor
+            res.headers['Link'] = f'<{url_for(".get_assignments", limit=limit, cursor=next_cursor, _external=True)}>; rel="next"'
+        logger.info(f"Returned {len(assignments)} assignments", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 200})
+        return res
 
     except Exception as e:
         logger.error(f"Server error: {e}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments', 'statusCode': 500})
         return jsonify({"message": f"Server error: {e}"}), 500
 
-@app.route(f'/{api_version}/assignments/<id>', methods = ['GET'])
+def assignment_schema(row):
+    # row is a tuple selected with ASSIGNMENT_COLUMNS; datetimes and UUIDs are
+    # left to the JSON encoder
+    return dict(zip(ASSIGNMENT_KEYS, row))
+
+def json_response(body, status):
+    # body is JSON already encoded to bytes, e.g. shared with the logger or
+    # taken from the response cache
+    return Response(body, status, mimetype='application/json')
+
+def stream_assignments(rows, stream):
+    if stream == 'ndjson':
+        for row in rows:
+            yield dumps(assignment_schema(row)) + b"\n"
+        return
+    yield b"["
+    separator = b""
+    for row in rows:
+        yield separator + dumps(assignment_schema(row))
+        separator = b","
+    yield b"]"
+
+@bp.route(f'/{api_version}/assignments/<id>', methods = ['GET'])
 def get_assignments_details(id):
-    c.incr('GET_assignment_details')
+    metrics.incr('GET_assignment_details')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authentication required", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 401})
@@ -220,31 +263,49 @@ def get_assignments_details(id):
         return jsonify({"message": "Request body should be empty"}), 400
     
     try:
-        assignments = Assignments.query.filter_by(id=id).first()
-        if not assignments:
+        # Served from the response cache when possible; a matching
+        # If-None-Match is answered with 304 without touching the database
+        # Keyed by the canonical UUID, as invalidation is, so any spelling of
+        # the id shares one entry
+        assign_id = parse_uuid(id)
+        if assign_id is None:
             logger.error("Assignment not found", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 404})
             return jsonify({"message": "Assignment not found"}), 404
-         
-        schema = {
-        "id": assignments.id,  
-        "name": assignments.name,
-        "points": assignments.points,
-        "num_of_attempts": assignments.num_of_attempts,
-        "deadline": assignments.deadline.isoformat(), 
-        "assignment_created": assignments.assignment_created.isoformat(),
-        "assignment_updated": assignments.assignment_updated.isoformat()
-         }
-        
-        logger.info(schema, extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 200})  
-        return schema,200
+        cache_key = f"assignment:{assign_id}"
+        cached = response_cache.get(cache_key)
+        if cached is None:
+            generation = response_cache.generation(cache_key)
+            row = Queries.assignment(assign_id)
+            if not row:
+                logger.error("Assignment not found", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 404})
+                return jsonify({"message": "Assignment not found"}), 404
+
+            body = dumps(assignment_schema(row))
+            updated = row.assignment_updated
+            cached = CachedResponse(body, f'{row.id}-{updated.strftime("%Y%m%d%H%M%S%f")}', updated)
+            # A replica may not have replayed a write that just invalidated
+            # this key yet, so its answer is only kept for the lag allowed
+            router = current_app.extensions['replicas']
+            response_cache.set(cache_key, cached, router.pool.max_lag if used_replica() else None, generation)
+
+        if cached.etag in request.if_none_match:
+            logger.info("Assignment not modified", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 304})
+            res = make_response("", 304)
+        else:
+            logger.info(f"Returned assignment {id}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 200})
+            res = json_response(cached.body, 200)
+        res.set_etag(cached.etag)
+        res.last_modified = cached.last_modified.replace(tzinfo=timezone.utc)
+        res.headers['Cache-Control'] = 'private, no-cache'
+        return res
 
     except Exception as e:
         logger.error(f"Server error: {e}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 500})
         return jsonify({"message": f"Server error: {e}"}), 500
 
-@app.route(f'/{api_version}/assignments/<id>', methods = ['PUT'])
+@bp.route(f'/{api_version}/assignments/<id>', methods = ['PUT'])
 def update_assignments(id):
-    c.incr('Update_assignments')
+    metrics.incr('Update_assignments')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authentication required", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 401})
@@ -261,40 +322,45 @@ def update_assignments(id):
         return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
     
     try:
-        assignments = Assignments.query.filter_by(id=id).first()
+        assign_id = parse_uuid(id)
+        payload, message = ASSIGNMENT_SCHEMA.parse(request.get_json())
+        # The ownership-checked UPDATE is the only statement on success; the
+        # owner is looked up only to explain a failure
+        if message != "" or assign_id is None or not Queries.update_owned_assignment(assign_id, user.id, payload):
+            db.session.rollback()
+            exists, owner = Queries.assignment_owner(assign_id) if assign_id else (False, None)
+            if exists and owner != user.id:
+                logger.error("User does not have necessary permissions to Update-Forbidden", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 403})
+                return jsonify({"message": "User does not have necessary permissions to Update-Forbidden"}), 403
+
+            if not exists:
+                logger.error("Assignment not found", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 404})
+                return jsonify({"message": "Assignment not found"}), 404
 
-        if assignments.owner_user_id != user.id:
-            logger.error("User does not have necessary permissions to Update-Forbidden", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 403})
-            return jsonify({"message": "User does not have necessary permissions to Update-Forbidden"}), 403
-
-        if not assignments:
-            logger.error("Assignment not found", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 404})
-            return jsonify({"message": "Assignment not found"}), 404
-        
-        data = request.get_json()
-        message = Validation.isAssignDataValid(data)
-        if message != "":
             logger.error(message, extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 400})
             return jsonify({"message" : message}), 400
-    
-        assignments.name = data.get("name")
-        assignments.points = data.get("points")
-        assignments.num_of_attempts = data.get("num_of_attempts")
-        assignments.deadline = data.get("deadline")
-         
+
         db.session.commit()
+        response_cache.invalidate(f"assignment:{assign_id}")
 
         logger.info("Assignment updated Successfully!!", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 204}) 
         return {},204
 
+    except IntegrityError:
+        # Renamed to a name ix_assignments_name already holds
+        db.session.rollback()
+        logger.error("Assignment already exist", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 400})
+        return jsonify({"message":"Assignment already exist"}), 400
+
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Server error: {e}", extra={'method': 'PUT', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 500})
         return jsonify({"message": f"Server error: {e}"}), 500
     
 
-@app.route(f'/{api_version}/assignments/<id>', methods = ['DELETE'])
+@bp.route(f'/{api_version}/assignments/<id>', methods = ['DELETE'])
 def delete_assignments(id):
-    c.incr('Delete_assignments')
+    metrics.incr('Delete_assignments')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authentication required", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 401})
@@ -311,22 +377,24 @@ def delete_assignments(id):
         return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
     
     try:
-        assignments = Assignments.query.filter_by(id=id).first()
-
-        if assignments.owner_user_id != user.id:
-            logger.error("User does not have necessary permissions to Delete-Forbidden", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 403})
-            return jsonify({"message": "User does not have necessary permissions to Delete-Forbidden"}), 403
+        assign_id = parse_uuid(id)
+        # Same shape as update: one ownership-checked DELETE on success
+        if request.data or assign_id is None or not Queries.delete_owned_assignment(assign_id, user.id):
+            db.session.rollback()
+            exists, owner = Queries.assignment_owner(assign_id) if assign_id else (False, None)
+            if exists and owner != user.id:
+                logger.error("User does not have necessary permissions to Delete-Forbidden", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 403})
+                return jsonify({"message": "User does not have necessary permissions to Delete-Forbidden"}), 403
+
+            if request.data:
+                logger.error("Request body should be empty", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 400})
+                return jsonify({"message": "Request body should be empty"}), 400
 
-        if request.data:
-            logger.error("Request body should be empty", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 400})
-            return jsonify({"message": "Request body should be empty"}), 400
-    
-        if not assignments:
             logger.error("Assignment not found", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 404})
             return jsonify({"message": "Assignment not found"}), 404
 
-        db.session.delete(assignments)
         db.session.commit()
+        response_cache.invalidate(f"assignment:{assign_id}")
         
         logger.info("Assignment Deleted Successfully!!", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 204})
         return {},204
@@ -335,19 +403,247 @@ def delete_assignments(id):
         logger.error(f"Server error: {e}", extra={'method': 'DELETE', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 500})
         return jsonify({"message": f"Server error: {e}"}), 500
     
-@app.route(f'/{api_version}/assignments/<id>', methods = ['PATCH'])
+@bp.route(f'/{api_version}/assignments/<id>', methods = ['PATCH'])
 def update(id):
-    c.incr('Patch_assignments')
+    metrics.incr('Patch_assignments')
     logger.error("Method Not allowed", extra={'method': 'PATCH', 'uri': f'/{api_version}/assignments/'+ id, 'statusCode': 405})
     return {},405
 
 
 
-@app.route(f'/{api_version}/assignments/<id>/submission', methods = ['POST'])
+BATCH_LIMIT = int(os.getenv('BATCH_LIMIT', 500))
+
+def authenticate_batch(method, uri):
+    # Basic auth for the batch routes; returns (user, None) or (None, error response)
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        logger.error("Authentication required", extra={'method': method, 'uri': uri, 'statusCode': 401})
+        return None, (jsonify({"message": "Authentication required"}), 401)
+
+    email, password = Encryption.decode(auth_header)
+    if not Validation.validate_email(email):
+        logger.error("Invalid email format", extra={'method': method, 'uri': uri, 'statusCode': 400})
+        return None, (jsonify({"message": "Invalid email format"}), 400)
+
+    user = Validation.validate_user(email, password)
+    if not user:
+        logger.error("Invalid credentials-Unauthorised", extra={'method': method, 'uri': uri, 'statusCode': 401})
+        return None, (jsonify({"message" : "Invalid credentials-Unauthorised"}), 401)
+    return user, None
+
+def batch_items(method, uri):
+    # The request body must be a non-empty JSON array of at most BATCH_LIMIT items
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items or len(items) > BATCH_LIMIT:
+        message = f"Request body must be a JSON array of 1 to {BATCH_LIMIT} items"
+        logger.error(message, extra={'method': method, 'uri': uri, 'statusCode': 400})
+        return None, (jsonify({"message": message}), 400)
+    return items, None
+
+def parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+@bp.route(f'/{api_version}/assignments/batch', methods = ['POST'])
+def create_assignments_batch():
+    metrics.incr('Create_assignments_batch')
+    uri = f'/{api_version}/assignments/batch'
+    user, error = authenticate_batch('POST', uri)
+    if error:
+        return error
+    items, error = batch_items('POST', uri)
+    if error:
+        return error
+
+    results = [None] * len(items)
+    valid = {}
+    for index, data in enumerate(items):
+        payload, message = ASSIGNMENT_SCHEMA.parse(data)
+        if message != "":
+            results[index] = {"index": index, "status": 400, "message": message}
+        elif payload.name in valid:
+            results[index] = {"index": index, "status": 400, "message": "Assignment already exist"}
+        else:
+            valid[payload.name] = (index, payload)
+
+    try:
+        # One set-based lookup for name conflicts, one multi-row insert
+        existing = {name for (name,) in db.session.query(Assignments.name).filter(Assignments.name.in_(list(valid)))}
+        now = datetime.now(timezone.utc)
+        rows = []
+        for name, (index, payload) in valid.items():
+            if name in existing:
+                results[index] = {"index": index, "status": 400, "message": "Assignment already exist"}
+                continue
+            rows.append({
+                "id": uuid.uuid4(),
+                "name": name,
+                "points": payload.points,
+                "num_of_attempts": payload.num_of_attempts,
+                "deadline": payload.deadline,
+                "assignment_created": now,
+                "assignment_updated": now,
+                "owner_user_id": user.id
+            })
+
+        if rows:
+            # A name taken concurrently is skipped by ON CONFLICT and reported below
+            stmt = (insert(Assignments).values(rows)
+                    .on_conflict_do_nothing(index_elements=[Assignments.name])
+                    .returning(*ASSIGNMENT_COLUMNS))
+            created = {row.name: row for row in db.session.execute(stmt)}
+            db.session.commit()
+            for row in rows:
+                index = valid[row["name"]][0]
+                if row["name"] in created:
+                    results[index] = {"index": index, "status": 201, "assignment": assignment_schema(created[row["name"]])}
+                else:
+                    results[index] = {"index": index, "status": 400, "message": "Assignment already exist"}
+
+        created_count = sum(1 for result in results if result["status"] == 201)
+        body = dumps(results)
+        logger.info(f"Batch created {created_count} of {len(items)} assignments", extra={'method': 'POST', 'uri': uri, 'statusCode': 207, 'body': body})
+        return json_response(body, 207)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error, could not create assignments - {e}", extra={'method': 'POST', 'uri': uri, 'statusCode': 500})
+        return jsonify({"message": f"Database error, could not create assignments - {e}"}), 500
+
+@bp.route(f'/{api_version}/assignments/batch', methods = ['PUT'])
+def update_assignments_batch():
+    metrics.incr('Update_assignments_batch')
+    uri = f'/{api_version}/assignments/batch'
+    user, error = authenticate_batch('PUT', uri)
+    if error:
+        return error
+    items, error = batch_items('PUT', uri)
+    if error:
+        return error
+
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or parse_uuid(item.get("id")) is None:
+            results[index] = {"index": index, "status": 400, "message": "Each item needs a valid id"}
+            continue
+        payload, message = ASSIGNMENT_SCHEMA.parse({k: v for k, v in item.items() if k != "id"})
+        if message != "":
+            results[index] = {"index": index, "status": 400, "message": message}
+        elif parse_uuid(item["id"]) in valid:
+            results[index] = {"index": index, "status": 400, "message": "Duplicate id in batch"}
+        else:
+            valid[parse_uuid(item["id"])] = (index, payload)
+
+    try:
+        owners = dict(db.session.query(Assignments.id, Assignments.owner_user_id).filter(Assignments.id.in_(list(valid))))
+        names = [payload.name for _, payload in valid.values()]
+        taken = dict(db.session.query(Assignments.name, Assignments.id).filter(Assignments.name.in_(names)))
+        params = []
+        seen_names = set()
+        for assign_id, (index, payload) in valid.items():
+            if assign_id not in owners:
+                results[index] = {"index": index, "status": 404, "message": "Assignment not found"}
+            elif owners[assign_id] != user.id:
+                results[index] = {"index": index, "status": 403, "message": "User does not have necessary permissions to Update-Forbidden"}
+            elif taken.get(payload.name, assign_id) != assign_id or payload.name in seen_names:
+                results[index] = {"index": index, "status": 400, "message": "Assignment already exist"}
+            else:
+                seen_names.add(payload.name)
+                params.append({"b_id": assign_id, "b_name": payload.name, "b_points": payload.points,
+                               "b_attempts": payload.num_of_attempts, "b_deadline": payload.deadline})
+                results[index] = {"index": index, "status": 204}
+
+        if params:
+            stmt = (update(Assignments.__table__)
+                    .where(Assignments.id == bindparam("b_id"))
+                    .values(name=bindparam("b_name"), points=bindparam("b_points"),
+                            num_of_attempts=bindparam("b_attempts"), deadline=bindparam("b_deadline"),
+                            assignment_updated=datetime.now(timezone.utc)))
+            db.session.execute(stmt, params)
+            db.session.commit()
+            for param in params:
+                response_cache.invalidate(f"assignment:{param['b_id']}")
+
+        body = dumps(results)
+        logger.info(f"Batch updated {len(params)} of {len(items)} assignments", extra={'method': 'PUT', 'uri': uri, 'statusCode': 207, 'body': body})
+        return json_response(body, 207)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error, could not update assignments - {e}", extra={'method': 'PUT', 'uri': uri, 'statusCode': 500})
+        return jsonify({"message": f"Database error, could not update assignments - {e}"}), 500
+
+@bp.route(f'/{api_version}/assignments/batch', methods = ['DELETE'])
+def delete_assignments_batch():
+    metrics.incr('Delete_assignments_batch')
+    uri = f'/{api_version}/assignments/batch'
+    user, error = authenticate_batch('DELETE', uri)
+    if error:
+        return error
+    items, error = batch_items('DELETE', uri)
+    if error:
+        return error
+
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        assign_id = parse_uuid(item)
+        if assign_id is None:
+            results[index] = {"index": index, "status": 400, "message": "Invalid assignment id"}
+        elif assign_id in valid:
+            results[index] = {"index": index, "status": 400, "message": "Duplicate id in batch"}
+        else:
+            valid[assign_id] = index
+
+    try:
+        # Owner and whether submissions reference it, in one set-based lookup
+        has_submissions = exists().where(Submissions.assignment_id == Assignments.id)
+        found = {row.id: row for row in db.session.query(Assignments.id, Assignments.owner_user_id, has_submissions.label("has_submissions"))
+                                                  .filter(Assignments.id.in_(list(valid)))}
+        allowed = []
+        for assign_id, index in valid.items():
+            row = found.get(assign_id)
+            if row is None:
+                results[index] = {"index": index, "status": 404, "message": "Assignment not found"}
+            elif row.owner_user_id != user.id:
+                results[index] = {"index": index, "status": 403, "message": "User does not have necessary permissions to Delete-Forbidden"}
+            elif row.has_submissions:
+                results[index] = {"index": index, "status": 409, "message": "Assignment has submissions and cannot be deleted"}
+            else:
+                allowed.append(assign_id)
+
+        deleted = set()
+        if allowed:
+            # Re-checked in the DELETE itself, so a submission made since the
+            # lookup turns that item into a 409 instead of failing the batch
+            deleted = {row.id for row in db.session.execute(
+                delete(Assignments.__table__)
+                .where(Assignments.id.in_(allowed), ~has_submissions)
+                .returning(Assignments.id))}
+            db.session.commit()
+            for assign_id in allowed:
+                index = valid[assign_id]
+                if assign_id in deleted:
+                    results[index] = {"index": index, "status": 204}
+                    response_cache.invalidate(f"assignment:{assign_id}")
+                else:
+                    results[index] = {"index": index, "status": 409, "message": "Assignment has submissions and cannot be deleted"}
+
+        body = dumps(results)
+        logger.info(f"Batch deleted {len(deleted)} of {len(items)} assignments", extra={'method': 'DELETE', 'uri': uri, 'statusCode': 207, 'body': body})
+        return json_response(body, 207)
+
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Database error, could not delete assignments - {e}", extra={'method': 'DELETE', 'uri': uri, 'statusCode': 500})
+        return jsonify({"message": f"Database error, could not delete assignments - {e}"}), 500
+
+@bp.route(f'/{api_version}/assignments/<id>/submission', methods = ['POST'])
 def create_submission(id):
-    c.incr('Create_submissions')
-    # Initialize Boto3 SNS client
-    sns_client = boto3.client('sns', region_name=os.getenv('AWS_REGION'))
+    metrics.incr('Create_submissions')
     auth_header = request.headers.get('Authorization')
     if not auth_header:
         logger.error("Authorization required", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 401})
@@ -357,99 +653,102 @@ def create_submission(id):
     if not Validation.validate_email(email):
         logger.error("Invalid email format", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 400})
         return jsonify({"message": "Invalid email format"}), 400
+
+    # Verified like every other route, which also puts the credentials in
+    # the cache so later submissions skip bcrypt and the auth rate limit
+    if not Validation.validate_user(email, password):
+        logger.error("Invalid credentials-Unauthorised", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 401})
+        return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
     
     data = request.get_json()
-    submission_url= data.get("submission_url")
-    assign = Assignments.query.filter_by(id=id).first()
-    user = Users.query.filter_by(email=email).first()
-    message = Validation.isSubDataValid(data)
-    if message != "":
-
-        failure_message = {
-            "submission_url": submission_url,
-            "email": email,
-            "user_name": user.first_name,
-            "user_id": str(user.id),
-            "assign_id": str(id),
-            "status": "invalid_url"
-        }
+    payload, message = SUBMISSION_SCHEMA.parse(data)
+    if payload is not None:
+        submission_url = payload.submission_url
+    else:
+        submission_url = data.get("submission_url") if isinstance(data, dict) else None
+    # User, assignment and attempts used so far in one round trip; an id that
+    # is not a UUID matches no assignment
+    context = Queries.submission_context(parse_uuid(id), email)
+    if context is None:
+        logger.error("Invalid credentials-Unauthorised", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 401})
+        return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
 
-        sns_client.publish(
-            TopicArn=os.getenv('SNS_TOPIC_ARN'),
-            Message=json.dumps({'default': json.dumps(failure_message)}),
-            MessageStructure='json'
-        )
+    event = {
+        "submission_url": submission_url,
+        "email": email,
+        "user_name": context.first_name,
+        "user_id": str(context.user_id),
+        # Canonical form: the worker uses it in queries. The raw id is kept only
+        # for invalid_url notifications about an assignment that does not exist.
+        "assign_id": str(context.assignment_id or id)
+    }
+    if message != "":
+        # The invalid_url notification is queued; the worker publishes it
+        db.session.add(SubmissionJobs(status="invalid_url", payload=json.dumps(event)))
+        db.session.commit()
+        current_app.extensions['submission_worker'].notify()
 
         logger.error(message, extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 400})
         return jsonify({"message" : message}), 400
      
     
-    if not assign:
+    if context.assignment_id is None:
         logger.error("Assignment Not found", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 404})
         return jsonify({"message":"Assignment Not found"}), 404
     
     # Check if the deadline has passed
-    if datetime.now(timezone.utc) > assign.deadline:
+    if datetime.now(timezone.utc) > context.deadline:
         logger.error("Deadline has passed", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 400})
         return jsonify({"message": "Deadline has passed"}), 400
     
-    # Check the number of attempts
-    submission_count = Submissions.query.filter_by(assignment_id=assign.id).count()
-    if submission_count >= assign.num_of_attempts:
+    if context.attempts is not None and context.attempts >= context.num_of_attempts:
         logger.error("Maximum number of attempts exceeded", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 400})
         return jsonify({"message": "Maximum number of attempts exceeded"}), 400
 
-    new_sub = Submissions(submission_url=submission_url, assignment_id=assign.id)
-    db.session.add(new_sub)
-    try:    
-
-        response = requests.get(submission_url, stream=True)
-        if response.status_code == 200:
-
-        # Sending SNS message
-            message = {
-                "submission_url": submission_url,
-                "email": email,
-                "user_name": user.first_name,
-                "user_id": str(user.id),
-                "assign_id": str(id),
-                "status": "valid"
-            }
-            sns_client.publish(
-                TopicArn=os.getenv('SNS_TOPIC_ARN'),
-                Message=json.dumps({'default': json.dumps(message)}),
-                MessageStructure='json'
-            )
-
-            db.session.commit()
-            schema = {
-                "id": new_sub.id,
-                "assignment_id": assign.id,
-                "submission_url": new_sub.submission_url,
-                "submission_date": new_sub.submission_date,
-                "submission_updated": new_sub.submission_updated
-            } 
-            logger.info(schema, extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 201})
-            return schema,201
-        else:
+    try:
+        # Claim an attempt atomically: the upsert only bumps the per-user counter
+        # while it is below the limit, and holds the row lock until commit, so
+        # concurrent submissions cannot both pass the check
+        claim = (insert(SubmissionAttempts)
+                 .values(user_id=context.user_id, assignment_id=context.assignment_id, attempts=1)
+                 .on_conflict_do_update(
+                     index_elements=[SubmissionAttempts.user_id, SubmissionAttempts.assignment_id],
+                     set_={"attempts": SubmissionAttempts.attempts + 1},
+                     where=SubmissionAttempts.attempts < context.num_of_attempts)
+                 # xmax is 0 only on a freshly inserted row: the user's first submission
+                 .returning(SubmissionAttempts.attempts, literal_column("xmax = 0").label("first_submission")))
+        claimed = db.session.execute(claim).first()
+        if claimed is None:
+            db.session.rollback()
+            logger.error("Maximum number of attempts exceeded", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 400})
+            return jsonify({"message": "Maximum number of attempts exceeded"}), 400
+
+        # Persist the submission as pending; the URL probe and SNS publish run
+        # in the background worker so a slow submission host cannot hold a request
+        new_sub = Submissions(submission_url=submission_url, assignment_id=context.assignment_id)
+        db.session.add(new_sub)
+        db.session.flush()
+        db.session.add(SubmissionJobs(submission_id=new_sub.id, status="pending", payload=json.dumps(event)))
+        db.session.flush()
+        # Last before commit: concurrent submissions to one assignment queue
+        # on its stats row, so hold that lock as briefly as possible
+        Queries.record_submission(context.assignment_id, claimed.first_submission)
+        db.session.commit()
+        current_app.extensions['submission_worker'].notify()
 
-            failure_message = {
-                "submission_url": submission_url,  
-                "email": email,
-                "user_name": user.first_name,
-                "user_id": str(user.id),
-                "assign_id": str(id),
-                "status": "no_file"
-                }
-        
-            sns_client.publish(
-                Message=json.dumps({'default': json.dumps(failure_message)}),
-                MessageStructure='json',
-                TopicArn=os.getenv('SNS_TOPIC_ARN')
-            )
-        
-            logger.error("Submission URL could not be reached", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 404})
-            return jsonify({"message": "Submission URL could not be reached"}), 404
+        schema = {
+            "id": new_sub.id,
+            "assignment_id": context.assignment_id,
+            "submission_url": new_sub.submission_url,
+            "submission_date": new_sub.submission_date,
+            "submission_updated": new_sub.submission_updated,
+            "status": "pending"
+        }
+        body = dumps(schema)
+        logger.info("Submission accepted", extra={'method': 'POST', 'uri': f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 202, 'body': body})
+        res = json_response(body, 202)
+        res.headers['Location'] = url_for('.get_submission_status', id=id, submission_id=new_sub.id)
+        return res
 
     except Exception as e:
 
@@ -457,10 +756,164 @@ def create_submission(id):
             logger.error(f"Database error, could not submit assignment - {e}", extra={'method': 'POST', 'uri':f'/{api_version}/assignments/'+ id +'/submission', 'statusCode': 500})
             return jsonify({"message": f"Database error, could not submit assignment - {e}"}), 500
 
+@bp.route(f'/{api_version}/assignments/<id>/submission/<submission_id>', methods = ['GET'])
+def get_submission_status(id, submission_id):
+    metrics.incr('GET_submission_status')
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        logger.error("Authentication required", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 401})
+        return jsonify({"message": "Authentication required"}), 401
+
+    email, password = Encryption.decode(auth_header)
+    if not Validation.validate_email(email):
+        logger.error("Invalid email format", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 400})
+        return jsonify({"message": "Invalid email format"}), 400
+
+    user = Validation.validate_user(email, password)
+    if not user:
+        logger.error("Invalid credentials-Unauthorised", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 401})
+        return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
+
+    try:
+        assign_id, sub_id = parse_uuid(id), parse_uuid(submission_id)
+        row = Queries.submission_status(assign_id, sub_id) if assign_id and sub_id else None
+        if not row:
+            logger.error("Submission not found", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 404})
+            return jsonify({"message": "Submission not found"}), 404
+
+        # Readable by the assignment's owner and by the student who submitted
+        # it, as recorded in the job payload
+        submitter = json.loads(row.payload).get("user_id") if row.payload else None
+        if row.owner_user_id != user.id and submitter != str(user.id):
+            logger.error("User does not have necessary permissions to view submission-Forbidden", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 403})
+            return jsonify({"message": "User does not have necessary permissions to view submission-Forbidden"}), 403
+
+        schema = {
+            "id": row.id,
+            "assignment_id": row.assignment_id,
+            "submission_url": row.submission_url,
+            "submission_date": row.submission_date,
+            "submission_updated": row.submission_updated,
+            "status": row.status or "valid"
+        }
+        body = dumps(schema)
+        logger.info("Returned submission status", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 200, 'body': body})
+        return json_response(body, 200)
+
+    except Exception as e:
+        logger.error(f"Server error: {e}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/submission/'+ submission_id, 'statusCode': 500})
+        return jsonify({"message": f"Server error: {e}"}), 500
+
+@bp.route(f'/{api_version}/assignments/<id>/stats', methods = ['GET'])
+def get_submission_stats(id):
+    metrics.incr('GET_submission_stats')
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        logger.error("Authentication required", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 401})
+        return jsonify({"message": "Authentication required"}), 401
+
+    email, password = Encryption.decode(auth_header)
+    if not Validation.validate_email(email):
+        logger.error("Invalid email format", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 400})
+        return jsonify({"message": "Invalid email format"}), 400
+
+    user = Validation.validate_user(email, password)
+    if not user:
+        logger.error("Invalid credentials-Unauthorised", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 401})
+        return jsonify({"message" : "Invalid credentials-Unauthorised"}), 401
+
+    try:
+        # One primary-key read of the maintained counters, never a scan of submissions
+        assign_id = parse_uuid(id)
+        row = Queries.submission_stats(assign_id) if assign_id else None
+        if not row:
+            logger.error("Assignment not found", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 404})
+            return jsonify({"message": "Assignment not found"}), 404
+
+        if row.owner_user_id != user.id:
+            logger.error("User does not have necessary permissions to view stats-Forbidden", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 403})
+            return jsonify({"message": "User does not have necessary permissions to view stats-Forbidden"}), 403
+
+        schema = {
+            "assignment_id": assign_id,
+            "total_submissions": row.total or 0,
+            "distinct_submitters": row.submitters or 0,
+            "last_submission": row.last_submission,
+            "by_status": {
+                "pending": row.pending or 0,
+                "valid": row.valid or 0,
+                "no_file": row.no_file or 0,
+                "too_large": row.too_large or 0
+            }
+        }
+        body = dumps(schema)
+        logger.info("Returned submission stats", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 200, 'body': body})
+        return json_response(body, 200)
+
+    except Exception as e:
+        logger.error(f"Server error: {e}", extra={'method': 'GET', 'uri': f'/{api_version}/assignments/'+ id +'/stats', 'statusCode': 500})
+        return jsonify({"message": f"Server error: {e}"}), 500
+
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    # Behind the load balancer, the client address comes from the
+    # X-Forwarded-For entry it appends (used for per-address rate limits)
+    proxy_hops = int(os.getenv('PROXY_HOPS', 1))
+    if proxy_hops > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
+
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"postgresql+psycopg2://{os.getenv('DBUSER')}:{os.getenv('DBPASS')}@{os.getenv('DBHOST')}:{os.getenv('DBPORT')}/{os.getenv('DATABASE')}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options()
+    app.config['SQLALCHEMY_REPLICA_URIS'] = replica_uris()
+    if config:
+        app.config.update(config)
+
+    # The engine and its pool are created on first use inside each worker
+    # process, so nothing here opens a connection before a prefork server forks
+    db.init_app(app)
+    init_metrics(app)
+    # Registered after metrics so rejected requests are still counted
+    if os.getenv('ADMISSION_ENABLED', '1') == '1':
+        app.extensions['admission'] = AdmissionController(credential_cache)
+        app.extensions['admission'].init_app(app)
+    # Without DB_REPLICA_HOSTS every query goes to the primary
+    ReplicaRouter(ReplicaPool(app.config['SQLALCHEMY_REPLICA_URIS'])).init_app(app)
+    app.register_blueprint(bp)
+
+    app.extensions['health_checker'] = HealthChecker(app)
+    app.extensions['submission_worker'] = SubmissionWorker(
+        app, workers=int(os.getenv('SUBMISSION_WORKERS', 4)), publisher=sns_publisher)
+
+    # Schema creation and seeding run once per deploy (see packer/webapp.service),
+    # not on every import or in every worker
+    @app.cli.command('init-db')
+    def init_db():
+        applied = migrate(db.engine)
+        print(f"Applied migrations: {applied}" if applied else "Database schema is up to date")
+
+    @app.cli.command('requeue-submission-jobs')
+    def requeue_submission_jobs():
+        print(f"Requeued {SubmissionWorker.requeue_parked()} parked submission jobs")
+
+    @app.cli.command('seed-users')
+    def seed_users_command():
+        response, status = add_users()
+        print(response.get_json(), status)
+        if status >= 400:
+            raise SystemExit(1)
+
+    return app
+
+app = create_app()
 
 if __name__ == '__main__':
+    # Local development server; production runs wsgi.py under gunicorn
     with app.app_context():
+        migrate(db.engine)
         response, status = add_users()
         print(response.get_json(), status)
-    app.run(host="0.0.0.0",debug=True)
-
+    app.extensions['submission_worker'].start()
+    app.run(host="0.0.0.0", debug=os.getenv('FLASK_DEBUG') == '1')
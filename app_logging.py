@@ -1,15 +1,40 @@
+import atexit
 import logging
+import logging.handlers
 import os
-from datetime import datetime, timezone
-import json
+import queue
+import threading
+import time
+from util.serialization import dumps, lenient_default
+
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+LOG_MAX_MESSAGE_BYTES = int(os.getenv('LOG_MAX_MESSAGE_BYTES', 8192))
 
 class CustomFormatter(logging.Formatter):
+    def __init__(self, max_message_bytes=LOG_MAX_MESSAGE_BYTES):
+        super().__init__()
+        self.max_message_bytes = max_message_bytes
+        self._second = None
+        self._second_prefix = None
+
     def format(self, record):
+        # Timestamps come from the record, so they reflect when the event
+        # happened rather than when the background thread wrote it
+        second = int(record.created)
+        if second != self._second:
+            self._second = second
+            self._second_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        timestamp = f"{self._second_prefix}.{int(record.msecs):03d}Z"
+
+        message = record.getMessage()
+        if len(message) > self.max_message_bytes:
+            message = f"{message[:self.max_message_bytes]}... [truncated {len(message) - self.max_message_bytes} chars]"
+
         # Construct log message as object
         log_message = {
-            "timestamp": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+            "timestamp": timestamp,
             "level": record.levelname,
-            "message": record.getMessage()
+            "message": message
         }
 
         # Conditionally add properties if they exist
@@ -21,20 +46,106 @@ class CustomFormatter(logging.Formatter):
             log_message["statusCode"] = record.statusCode
 
         # Convert log message to a single line string
-        return f"{log_message['timestamp']} {log_message['level']}: {json.dumps(log_message)}"
+        line = dumps(log_message, default=lenient_default)
+
+        # A response body passed as already-encoded JSON bytes is spliced in
+        # as-is rather than decoded and serialized again
+        body = getattr(record, 'body', None)
+        if body is not None:
+            if len(body) > self.max_message_bytes:
+                body = dumps(f"{body[:self.max_message_bytes].decode('utf-8', 'ignore')}... [truncated {len(body) - self.max_message_bytes} bytes]")
+            line = line[:-1] + b',"body":' + body + b'}'
+
+        return f"{timestamp} {record.levelname}: {line.decode('utf-8')}"
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    # Hands records to the listener thread without formatting them first, so
+    # str()/json of large payloads never runs on the request thread. When the
+    # queue is full the record is dropped and counted instead of blocking.
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
 
-# Get application root path 
+    def enqueue(self, record):
+        _ensure_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class DropReportingHandler(logging.handlers.WatchedFileHandler):
+    # Writes a line noting how many records were dropped since the last one
+    def __init__(self, queue_handler, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue_handler = queue_handler
+        self._reported = 0
+
+    def emit(self, record):
+        dropped = self.queue_handler.dropped
+        if dropped != self._reported:
+            notice = logging.LogRecord(logger.name, logging.WARNING, __file__, 0,
+                                       f"Log queue full, dropped {dropped - self._reported} records", None, None)
+            self._reported = dropped
+            super().emit(notice)
+        super().emit(record)
+
+# Get application root path
 app_root = os.path.dirname(os.path.abspath(__file__))
 
 # Create logger
 logger = logging.getLogger('csye6225Logger')
 logger.setLevel(logging.INFO)  # Set default log level
 
-# Create file handler
-file_handler = logging.FileHandler(os.path.join(app_root,'csye6225.log'))
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+
+# Every gunicorn worker appends to the same csye6225.log, so no process may
+# rotate it: logrotate does (packer/webapp.logrotate), and each process reopens
+# the path once it sees the file was moved. The CloudWatch agent tails the
+# file by name (config.json).
+file_handler = DropReportingHandler(queue_handler, os.path.join(app_root,'csye6225.log'), delay=True)
 file_handler.setFormatter(CustomFormatter())
 
-# Add file handler to logger
-logger.addHandler(file_handler)
+# Records are written by a background listener thread, started on the first
+# record rather than at import so importing the app starts no threads
+logger.addHandler(queue_handler)
+listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+def _ensure_listener():
+    global listener, _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid != os.getpid():
+            listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+            listener.start()
+            _listener_pid = os.getpid()
+
+def _reset_after_fork():
+    # The listener thread does not survive fork, and the inherited queue or
+    # lock may be held mid-operation by a parent thread: start fresh in the child
+    global listener, log_queue, _listener_pid, _listener_lock
+    _listener_lock = threading.Lock()
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler.queue = log_queue
+    listener = None
+    _listener_pid = None
+
+def _stop_listener():
+    # Flushes every queued record before the process exits
+    global listener, _listener_pid
+    with _listener_lock:
+        if listener is not None and _listener_pid == os.getpid():
+            listener.stop()
+        listener = None
+        _listener_pid = None
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(_stop_listener)
 
 # logger.info('This is a test log message.', extra={'method': 'GET', 'uri': '/api/test', 'statusCode': 200})
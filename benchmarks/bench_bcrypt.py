@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import bcrypt
+
+# Measures bcrypt verify latency per cost on this host, to pick BCRYPT_ROUNDS.
+# Run it on the instance type that serves traffic:
+#
+#   python benchmarks/bench_bcrypt.py --min 10 --max 14 --budget-ms 250
+
+
+def measure(rounds, iterations, password=b"benchmark-password"):
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        bcrypt.checkpw(password, hashed)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "rounds": rounds,
+        "iterations": iterations,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        # One core runs one bcrypt at a time; this is the per-core login ceiling
+        "verifies_per_core_s": round(1000 / statistics.fmean(samples), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="bcrypt verify latency per cost")
+    parser.add_argument('--min', type=int, default=10)
+    parser.add_argument('--max', type=int, default=14)
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, help="report the highest cost whose p95 fits this budget")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure(rounds, args.iterations) for rounds in range(args.min, args.max + 1)]
+    recommended = None
+    if args.budget_ms is not None:
+        fitting = [result["rounds"] for result in results if result["p95_ms"] <= args.budget_ms]
+        recommended = max(fitting) if fitting else None
+
+    if args.json:
+        print(json.dumps({"cpus": os.cpu_count(), "results": results, "budget_ms": args.budget_ms,
+                          "recommended_rounds": recommended}, indent=2))
+        return
+
+    print(f"{'rounds':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'verifies/core/s':>16}")
+    for result in results:
+        print(f"{result['rounds']:>6} {result['mean_ms']:>10.2f} {result['p50_ms']:>10.2f} "
+              f"{result['p95_ms']:>10.2f} {result['verifies_per_core_s']:>16.1f}")
+    if args.budget_ms is not None:
+        print(f"Highest cost within {args.budget_ms} ms: {recommended if recommended else 'none'}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
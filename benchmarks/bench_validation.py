@@ -0,0 +1,41 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from util.validations import Validation
+from util.schema import ASSIGNMENT_SCHEMA, SUBMISSION_SCHEMA
+
+# Compares the legacy validators with the precompiled single-pass schemas.
+# Run with: python benchmarks/bench_validation.py [iterations]
+
+ASSIGNMENTS = {
+    'valid': {"name": "Assignment 01", "points": 10, "num_of_attempts": 3, "deadline": "2024-11-01T09:29:29.000Z"},
+    'bad_deadline': {"name": "Assignment 01", "points": 10, "num_of_attempts": 3, "deadline": "next tuesday"},
+    'bad_points': {"name": "Assignment 01", "points": 500, "num_of_attempts": 3, "deadline": "2024-11-01T09:29:29.000Z"},
+    'missing': {"name": "Assignment 01", "points": 10},
+}
+
+SUBMISSIONS = {
+    'valid': {"submission_url": "https://github.com/user/repo/archive/main.zip"},
+    'bad_url': {"submission_url": "ftp://example.com/file.tar"},
+}
+
+
+def bench(label, func, payload, iterations):
+    seconds = timeit.timeit(lambda: func(payload), number=iterations)
+    print(f"{label:<36} {seconds / iterations * 1e6:8.2f} us/call")
+
+
+def main(iterations=100000):
+    for name, payload in ASSIGNMENTS.items():
+        bench(f"assignment/{name}/legacy", Validation.isAssignDataValid, payload, iterations)
+        bench(f"assignment/{name}/schema", ASSIGNMENT_SCHEMA.parse, payload, iterations)
+    for name, payload in SUBMISSIONS.items():
+        bench(f"submission/{name}/legacy", Validation.isSubDataValid, payload, iterations)
+        bench(f"submission/{name}/schema", SUBMISSION_SCHEMA.parse, payload, iterations)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
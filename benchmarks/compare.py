@@ -0,0 +1,70 @@
+import argparse
+import json
+import sys
+
+# Compares two load_test.py reports route by route:
+#
+#   python benchmarks/compare.py results/base.json results/head.json --threshold 10
+#
+# Exits with status 1 when any route's p95 grew, or its RPS dropped, by more
+# than --threshold percent.
+
+METRICS = (("rps", 1), ("p50_ms", -1), ("p95_ms", -1), ("p99_ms", -1))
+
+
+def change(before, after):
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(base, head, threshold):
+    regressions = []
+    rows = []
+    for label in sorted(set(base["routes"]) | set(head["routes"])):
+        old = base["routes"].get(label)
+        new = head["routes"].get(label)
+        if old is None or new is None:
+            rows.append((label, "only in " + ("head" if old is None else "base"), []))
+            continue
+        cells = []
+        for metric, better in METRICS:
+            delta = change(old[metric], new[metric])
+            cells.append((metric, old[metric], new[metric], delta))
+            if delta is not None and delta * better < -threshold and metric in ("rps", "p95_ms"):
+                regressions.append(f"{label} {metric} {delta:+.1f}%")
+        rows.append((label, None, cells))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two load test reports")
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--threshold', type=float, default=10, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+
+    print(f"base {base.get('meta', {}).get('commit')}  head {head.get('meta', {}).get('commit')}")
+    rows, regressions = compare(base, head, args.threshold)
+    for label, note, cells in rows:
+        if note:
+            print(f"{label:<40} {note}")
+            continue
+        print(label)
+        for metric, old, new, delta in cells:
+            shown = "n/a" if delta is None else f"{delta:+.1f}%"
+            print(f"    {metric:<8} {old:>10.2f} -> {new:>10.2f}  {shown}")
+
+    if regressions:
+        print("Regressions over threshold:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+import argparse
+import base64
+import csv
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stubs import serve, StubSNSHandler, ZipFileHandler
+
+# Load test for the v3 API.
+#
+# Brings up the app under gunicorn against the Postgres database named by the
+# usual DBUSER/DBPASS/DBHOST/DBPORT/DATABASE variables, with a stub SNS
+# endpoint and a local file server for submission URLs. Seeds users and
+# assignments, drives a weighted mix of concurrent requests and writes
+# per-route throughput and latency percentiles as JSON for compare.py.
+#
+#   python benchmarks/load_test.py --users 50 --assignments 2000 \
+#       --concurrency 32 --duration 30 --output results/HEAD.json
+#
+# Pass --base-url to drive an app that is already running (and seeded with
+# --users users from a previous run) instead of starting one.
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = "list=4,detail=10,create=1,submit=2,healthz=1"
+PERCENTILES = (50, 95, 99)
+ROUTE_LABELS = {
+    "list": "GET /v3/assignments",
+    "detail": "GET /v3/assignments/{id}",
+    "create": "POST /v3/assignments",
+    "submit": "POST /v3/assignments/{id}/submission",
+    "healthz": "GET /healthz",
+}
+
+
+def user_credentials(index):
+    return f"bench.user{index}@example.com", f"bench-pass-{index}"
+
+
+def auth_header(index):
+    email, password = user_credentials(index)
+    return "Basic " + base64.b64encode(f"{email}:{password}".encode('utf-8')).decode('ascii')
+
+
+def write_users_csv(path, count):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["first_name", "last_name", "email", "password"])
+        for index in range(count):
+            email, password = user_credentials(index)
+            writer.writerow(["bench", f"user{index}", email, password])
+
+
+def deadline():
+    return (datetime.now(timezone.utc) + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class AppServer():
+    # gunicorn subprocess serving wsgi.py with the stubs wired in through env
+    def __init__(self, env, port, workers, threads):
+        self.env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}",
+                        WEB_CONCURRENCY=str(workers), WEB_THREADS=str(threads))
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.process = None
+
+    def flask(self, *command):
+        subprocess.run([sys.executable, "-m", "flask", "--app", "app", *command],
+                       cwd=REPO_ROOT, env=self.env, check=True)
+
+    def start(self, timeout=60):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+            cwd=REPO_ROOT, env=self.env)
+        give_up = time.monotonic() + timeout
+        while time.monotonic() < give_up:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited with {self.process.returncode}")
+            try:
+                if requests.get(f"{self.base_url}/healthz", timeout=1).status_code == 200:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
+        raise RuntimeError("App did not become healthy in time")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait(30)
+
+
+def seed_assignments(base_url, count, batch_size=500):
+    session = requests.Session()
+    session.headers['Authorization'] = auth_header(0)
+    for start in range(0, count, batch_size):
+        items = [{"name": f"bench-{uuid.uuid4().hex}", "points": 10, "num_of_attempts": 100, "deadline": deadline()}
+                 for _ in range(min(batch_size, count - start))]
+        response = session.post(f"{base_url}/v3/assignments/batch", json=items, timeout=60)
+        response.raise_for_status()
+
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": 1000}
+        if cursor:
+            params["cursor"] = cursor
+        response = session.get(f"{base_url}/v3/assignments", params=params, timeout=60)
+        if response.status_code == 404:
+            break
+        response.raise_for_status()
+        ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    return ids
+
+
+class LoadDriver():
+    def __init__(self, base_url, file_url, users, assignment_ids, mix, seed=6225):
+        self.base_url = base_url
+        self.file_url = file_url
+        self.users = users
+        self.assignment_ids = assignment_ids
+        self.routes = [(name, weight) for name, weight in mix.items() if weight > 0]
+        self.seed = seed
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def request(self, session, rng, route):
+        user = rng.randrange(self.users)
+        headers = {"Authorization": auth_header(user)}
+        if route == "list":
+            return session.get(
+                f"{self.base_url}/v3/assignments", params={"limit": 100}, headers=headers, timeout=30)
+        if route == "detail":
+            return session.get(
+                f"{self.base_url}/v3/assignments/{rng.choice(self.assignment_ids)}", headers=headers, timeout=30)
+        if route == "create":
+            body = {"name": f"bench-{uuid.uuid4().hex}", "points": 10, "num_of_attempts": 3, "deadline": deadline()}
+            return session.post(
+                f"{self.base_url}/v3/assignments", json=body, headers=headers, timeout=30)
+        if route == "submit":
+            body = {"submission_url": f"{self.file_url}/{uuid.uuid4().hex}.zip"}
+            return session.post(
+                f"{self.base_url}/v3/assignments/{rng.choice(self.assignment_ids)}/submission",
+                json=body, headers=headers, timeout=30)
+        if route == "healthz":
+            return session.get(f"{self.base_url}/healthz", timeout=30)
+
+    def _worker(self, index, stop_at, budget):
+        rng = random.Random(self.seed + index)
+        names = [name for name, _ in self.routes]
+        weights = [weight for _, weight in self.routes]
+        session = requests.Session()
+        local = {}
+        while time.monotonic() < stop_at and budget():
+            route = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = self.request(session, rng, route).status_code
+            except requests.RequestException:
+                status = "error"
+            elapsed = (time.perf_counter() - start) * 1000
+            entry = local.setdefault(ROUTE_LABELS[route], {"latencies": [], "statuses": {}})
+            entry["latencies"].append(elapsed)
+            entry["statuses"][str(status)] = entry["statuses"].get(str(status), 0) + 1
+        with self._lock:
+            for label, entry in local.items():
+                merged = self.samples.setdefault(label, {"latencies": [], "statuses": {}})
+                merged["latencies"].extend(entry["latencies"])
+                for status, count in entry["statuses"].items():
+                    merged["statuses"][status] = merged["statuses"].get(status, 0) + count
+
+    def run(self, concurrency, duration, max_requests=None):
+        remaining = [max_requests]
+        counter_lock = threading.Lock()
+
+        def budget():
+            if remaining[0] is None:
+                return True
+            with counter_lock:
+                remaining[0] -= 1
+                return remaining[0] >= 0
+
+        stop_at = time.monotonic() + duration
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self._worker, args=(i, stop_at, budget)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(self.samples, time.perf_counter() - started)
+
+
+def percentile(ordered, pct):
+    # Nearest-rank percentile of an already sorted list
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples, elapsed):
+    routes = {}
+    for label, entry in sorted(samples.items()):
+        ordered = sorted(entry["latencies"])
+        errors = sum(count for status, count in entry["statuses"].items() if status == "error" or int(status) >= 500)
+        routes[label] = {
+            "requests": len(ordered),
+            "rps": round(len(ordered) / elapsed, 2),
+            "errors": errors,
+            "statuses": entry["statuses"],
+            "mean_ms": round(sum(ordered) / len(ordered), 3),
+            **{f"p{pct}_ms": round(percentile(ordered, pct), 3) for pct in PERCENTILES},
+            "max_ms": round(ordered[-1], 3),
+        }
+    total = sum(route["requests"] for route in routes.values())
+    return {"elapsed_s": round(elapsed, 3), "total_requests": total, "total_rps": round(total / elapsed, 2), "routes": routes}
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    print(f"{'route':<40} {'req':>7} {'rps':>9} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for label, route in report["routes"].items():
+        print(f"{label:<40} {route['requests']:>7} {route['rps']:>9.1f} {route['errors']:>5} "
+              f"{route['p50_ms']:>9.2f} {route['p95_ms']:>9.2f} {route['p99_ms']:>9.2f}")
+    print(f"{'total':<40} {report['total_requests']:>7} {report['total_rps']:>9.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the v3 API")
+    parser.add_argument('--base-url', help="drive an already running app instead of starting one")
+    parser.add_argument('--port', type=int, default=5099)
+    parser.add_argument('--web-workers', type=int, default=2)
+    parser.add_argument('--web-threads', type=int, default=4)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--assignments', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--warmup', type=float, default=5, help="seconds of unrecorded traffic first")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"route=weight list (default {DEFAULT_MIX})")
+    parser.add_argument('--seed', type=int, default=6225)
+    parser.add_argument('--output', help="write the JSON report here")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+    unknown = set(mix) - set(ROUTE_LABELS)
+    if unknown:
+        parser.error(f"unknown routes in --mix: {', '.join(sorted(unknown))}")
+
+    sns_server, sns_url = serve(StubSNSHandler)
+    file_server, file_url = serve(ZipFileHandler)
+    server = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            base_url = args.base_url
+            if base_url is None:
+                users_csv = os.path.join(tmp, "users.csv")
+                write_users_csv(users_csv, args.users)
+                env = dict(os.environ,
+                           CSV_PATH=users_csv,
+                           SNS_ENDPOINT_URL=sns_url,
+                           SNS_TOPIC_ARN="arn:aws:sns:us-east-1:000000000000:bench",
+                           AWS_REGION=os.getenv('AWS_REGION', 'us-east-1'),
+                           AWS_ACCESS_KEY_ID=os.getenv('AWS_ACCESS_KEY_ID', 'bench'),
+                           AWS_SECRET_ACCESS_KEY=os.getenv('AWS_SECRET_ACCESS_KEY', 'bench'),
+                           STATSD_HOST=os.getenv('STATSD_HOST', '127.0.0.1'),
+                           # Per-user rate limits (1 submission/s by default)
+                           # would turn most samples into 429s; measure the
+                           # routes themselves unless asked otherwise
+                           ADMISSION_ENABLED=os.getenv('ADMISSION_ENABLED', '0'))
+                server = AppServer(env, args.port, args.web_workers, args.web_threads)
+                server.flask("init-db")
+                server.flask("seed-users")
+                server.start()
+                base_url = server.base_url
+
+            assignment_ids = seed_assignments(base_url, args.assignments)
+            if not assignment_ids:
+                raise SystemExit("No assignments to benchmark against")
+
+            if args.warmup > 0:
+                LoadDriver(base_url, file_url, args.users, assignment_ids, mix, args.seed).run(args.concurrency, args.warmup)
+            driver = LoadDriver(base_url, file_url, args.users, assignment_ids, mix, args.seed)
+            report = driver.run(args.concurrency, args.duration, args.requests)
+    finally:
+        if server is not None:
+            server.stop()
+        sns_server.shutdown()
+        file_server.shutdown()
+
+    report["meta"] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sns_messages": StubSNSHandler.published,
+        "args": vars(args),
+    }
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
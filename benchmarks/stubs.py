@@ -0,0 +1,82 @@
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Local stand-ins for the app's outbound dependencies during benchmarks:
+# an SNS endpoint speaking the query protocol boto3 uses, and a file server
+# for submission URLs.
+
+SNS_NAMESPACE = "http://sns.amazonaws.com/doc/2010-03-31/"
+
+
+class StubSNSHandler(BaseHTTPRequestHandler):
+    # Accepts Publish and PublishBatch and reports every entry as successful
+    published = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+        action = form.get('Action', [''])[0]
+        if action == 'PublishBatch':
+            ids = [value[0] for key, value in sorted(form.items())
+                   if key.startswith('PublishBatchRequestEntries.member.') and key.endswith('.Id')]
+            members = "".join(f"<member><Id>{entry_id}</Id><MessageId>{uuid.uuid4()}</MessageId></member>" for entry_id in ids)
+            body = (f'<PublishBatchResponse xmlns="{SNS_NAMESPACE}"><PublishBatchResult>'
+                    f'<Successful>{members}</Successful><Failed/></PublishBatchResult>'
+                    f'<ResponseMetadata><RequestId>{uuid.uuid4()}</RequestId></ResponseMetadata></PublishBatchResponse>')
+            count = len(ids)
+        elif action == 'Publish':
+            body = (f'<PublishResponse xmlns="{SNS_NAMESPACE}"><PublishResult><MessageId>{uuid.uuid4()}</MessageId>'
+                    f'</PublishResult><ResponseMetadata><RequestId>{uuid.uuid4()}</RequestId></ResponseMetadata></PublishResponse>')
+            count = 1
+        else:
+            self.send_response(400)
+            self.end_headers()
+            return
+        with StubSNSHandler.lock:
+            StubSNSHandler.published += count
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class ZipFileHandler(BaseHTTPRequestHandler):
+    # Every *.zip path exists and is a few bytes long; anything else is a 404
+    content = b"PK\x05\x06" + b"\x00" * 18
+
+    def do_HEAD(self):
+        self._headers_for(self.path)
+
+    def do_GET(self):
+        if self._headers_for(self.path):
+            self.wfile.write(self.content)
+
+    def _headers_for(self, path):
+        if not path.endswith('.zip'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return False
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/zip')
+        self.send_header('Content-Length', str(len(self.content)))
+        self.end_headers()
+        return True
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler, host="127.0.0.1"):
+    # Starts the handler on a free port; returns (server, base_url)
+    server = ThreadingHTTPServer((host, 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
@@ -0,0 +1,43 @@
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Processes give CPU parallelism for bcrypt and JSON work; threads cover the
+# time each request spends waiting on Postgres
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('WEB_THREADS', 4))
+worker_class = 'gthread'
+
+timeout = int(os.getenv('WEB_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then to bound memory growth
+max_requests = 2000
+max_requests_jitter = 200
+
+# Each worker imports the app itself, so engines, pools and background threads
+# are created after the fork. If preloading is turned on, post_fork drops any
+# connections inherited from the master.
+preload_app = os.getenv('GUNICORN_PRELOAD', '0') == '1'
+
+# Created here in the master so every worker forked from it shares the
+# response cache's invalidation table, the replica router's recent writers
+# and the admission bucket key secret
+import util.response_cache
+import util.replicas
+import util.admission
+
+def post_fork(server, worker):
+    if preload_app:
+        from app import app
+        from util.db import db
+        with app.app_context():
+            db.engine.dispose()
+
+def post_worker_init(worker):
+    # Jobs left in submission_jobs by a restart or a recycled worker are
+    # drained right away, not only once this process takes a submission
+    from app import app
+    app.extensions['submission_worker'].start()
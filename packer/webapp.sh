@@ -48,6 +48,15 @@ sudo systemctl daemon-reload
 sudo systemctl enable webapp.service
 sudo systemctl start webapp.service
 
+# csye6225.log is shared by every gunicorn worker, so logrotate rotates it
+# (the app only reopens it); check hourly so the size limit holds
+echo "Setting up log rotation"
+sudo cp /home/ec2-user/webapp/packer/webapp.logrotate /etc/logrotate.d/webapp
+sudo chown root:root /etc/logrotate.d/webapp
+sudo mkdir -p /etc/systemd/system/logrotate.timer.d
+printf '[Timer]\nOnCalendar=\nOnCalendar=hourly\n' | sudo tee /etc/systemd/system/logrotate.timer.d/hourly.conf
+sudo systemctl daemon-reload
+
 # Download and install the CloudWatch Agent
 echo "Downloading and installing the CloudWatch Agent"
 sudo wget https://s3.amazonaws.com/amazoncloudwatch-agent/debian/amd64/latest/amazon-cloudwatch-agent.deb
@@ -0,0 +1,91 @@
+import base64
+import threading
+import pytest
+from flask import Flask, jsonify
+from util.admission import AdmissionController, LocalBucketBackend
+from util.auth_cache import CachedUser, CredentialCache
+
+def basic(email, password="secret"):
+    return {"Authorization": "Basic " + base64.b64encode(f"{email}:{password}".encode()).decode()}
+
+@pytest.fixture
+def setup():
+    app = Flask(__name__)
+    cache = CredentialCache()
+    release = threading.Event()
+    entered = threading.Event()
+
+    @app.route('/v3/assignments', endpoint='get_assignments')
+    def get_assignments():
+        return jsonify([])
+
+    @app.route('/v3/assignments/<id>/submission', methods=['POST'], endpoint='create_submission')
+    def create_submission(id):
+        entered.set()
+        release.wait(5)
+        return jsonify({}), 202
+
+    controller = AdmissionController(
+        cache,
+        rates={'auth': (1, 2), 'auth_addr': (1, 5), 'read': (1000, 1000), 'write': (1000, 1000), 'probe': (1000, 1000)},
+        in_flight={'auth': 10, 'read': 10, 'write': 10, 'probe': 1})
+    controller.init_app(app)
+    return app, cache, entered, release
+
+def test_bucket_refills_over_time():
+    backend = LocalBucketBackend()
+    assert backend.take("k", rate=10, burst=1) == (True, 0)
+    allowed, retry_after = backend.take("k", rate=10, burst=1)
+    assert not allowed and 0 < retry_after <= 0.1
+
+def test_uncached_credentials_are_rate_limited_per_credentials(setup):
+    app, cache, _, _ = setup
+    client = app.test_client()
+    statuses = [client.get('/v3/assignments', headers=basic("a@example.com")).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    rejected = client.get('/v3/assignments', headers=basic("a@example.com"))
+    assert rejected.headers["Retry-After"] == "1"
+
+    # Another user has their own bucket, and cached credentials skip the auth bucket
+    assert client.get('/v3/assignments', headers=basic("b@example.com")).status_code == 200
+    cache.put(cache.key("a@example.com:secret"), CachedUser(1, "a@example.com", "a", "a"))
+    assert client.get('/v3/assignments', headers=basic("a@example.com")).status_code == 200
+
+def test_wrong_passwords_do_not_drain_the_real_users_bucket(setup):
+    app, _, _, _ = setup
+    client = app.test_client()
+    for _ in range(5):
+        client.get('/v3/assignments', headers=basic("victim@example.com", "guess"))
+    assert client.get('/v3/assignments', headers=basic("victim@example.com")).status_code == 200
+
+def test_bucket_keys_do_not_depend_on_the_process_credential_cache():
+    # Each worker has its own credential cache secret; buckets must still match
+    first = AdmissionController(CredentialCache())
+    second = AdmissionController(CredentialCache())
+    header = basic("a@example.com")["Authorization"]
+    assert first.classify('get_assignments', header, '10.0.0.1') == second.classify('get_assignments', header, '10.0.0.1')
+
+def test_uncached_credentials_are_capped_per_address(setup):
+    app, _, _, _ = setup
+    client = app.test_client()
+    statuses = [client.get('/v3/assignments', headers=basic(f"u{i}@example.com"),
+                           environ_base={'REMOTE_ADDR': '10.0.0.1'}).status_code for i in range(6)]
+    assert statuses == [200] * 5 + [429]
+    other = client.get('/v3/assignments', headers=basic("u9@example.com"), environ_base={'REMOTE_ADDR': '10.0.0.2'})
+    assert other.status_code == 200
+
+def test_in_flight_limit_sheds_with_503(setup):
+    app, cache, entered, release = setup
+    cache.put(cache.key("a@example.com:secret"), CachedUser(1, "a@example.com", "a", "a"))
+    url = '/v3/assignments/1/submission'
+    first = threading.Thread(target=lambda: app.test_client().post(url, headers=basic("a@example.com")))
+    first.start()
+    assert entered.wait(5)
+    try:
+        busy = app.test_client().post(url, headers=basic("a@example.com"))
+        assert busy.status_code == 503
+        assert busy.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        first.join()
+    assert app.test_client().post(url, headers=basic("a@example.com")).status_code == 202
@@ -0,0 +1,39 @@
+import uuid
+from util.auth_cache import CredentialCache, CachedUser
+
+def make_user(email="jane.doe@example.com"):
+    return CachedUser(uuid.uuid4(), email, "jane", "doe")
+
+def test_cache_hit_and_miss():
+    cache = CredentialCache(maxsize=4, ttl=60)
+    key = cache.key("jane.doe@example.com:secret")
+    assert cache.get(key) is None
+    user = cache.put(key, make_user())
+    assert cache.get(key) is user
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_wrong_password_never_hits():
+    cache = CredentialCache(maxsize=4, ttl=60)
+    cache.put(cache.key("jane.doe@example.com:secret"), make_user())
+    assert cache.get(cache.key("jane.doe@example.com:guess")) is None
+
+def test_ttl_expiry():
+    cache = CredentialCache(maxsize=4, ttl=0)
+    key = cache.key("jane.doe@example.com:secret")
+    cache.put(key, make_user())
+    assert cache.get(key) is None
+    assert cache.stats()["size"] == 0
+
+def test_lru_bound_and_user_invalidation():
+    cache = CredentialCache(maxsize=2, ttl=60)
+    users = [make_user(f"user{i}@example.com") for i in range(3)]
+    keys = [cache.key(f"{u.email}:pw") for u in users]
+    for key, user in zip(keys, users):
+        cache.put(key, user)
+    assert cache.get(keys[0]) is None
+    assert cache.stats()["evictions"] == 1
+
+    cache.invalidate_user(users[2].id)
+    assert cache.get(keys[2]) is None
+    assert cache.get(keys[1]) is users[1]
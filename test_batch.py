@@ -0,0 +1,107 @@
+import base64
+import uuid
+import pytest
+from app import app
+from util.db import db, Users, Assignments, Submissions
+from util.encrypt import Encryption
+from util.migrations import migrate
+
+DEADLINE = "2099-01-01T00:00:00.000Z"
+
+def assignment_body(name, **overrides):
+    return dict({"name": name, "points": 10, "num_of_attempts": 3, "deadline": DEADLINE}, **overrides)
+
+@pytest.fixture
+def users(monkeypatch):
+    monkeypatch.setattr(app.extensions['submission_worker'], 'workers', 0)
+    monkeypatch.setattr(app.extensions['admission'], 'enabled', False)
+    emails = [f"batch.{uuid.uuid4().hex[:8]}@example.com" for _ in range(2)]
+    with app.app_context():
+        migrate(db.engine)
+        rows = [Users(first_name="batch", last_name="test", email=email, password=Encryption.encrypt("secret")) for email in emails]
+        db.session.add_all(rows)
+        db.session.commit()
+        ids = [row.id for row in rows]
+    yield [{"Authorization": "Basic " + base64.b64encode(f"{email}:secret".encode()).decode()} for email in emails]
+    with app.app_context():
+        for user_id in ids:
+            db.session.execute(db.text("DELETE FROM submissions WHERE assignment_id IN (SELECT id FROM assignments WHERE owner_user_id = :id)"), {"id": user_id})
+            db.session.execute(db.text("DELETE FROM assignments WHERE owner_user_id = :id"), {"id": user_id})
+            db.session.execute(db.text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        db.session.commit()
+
+def create(client, auth, *names):
+    response = client.post("/v3/assignments/batch", headers=auth, json=[assignment_body(name) for name in names])
+    return [result["assignment"]["id"] for result in response.get_json()]
+
+def statuses(response):
+    assert response.status_code == 207
+    results = response.get_json()
+    assert [result["index"] for result in results] == list(range(len(results)))
+    return [result["status"] for result in results]
+
+def test_batch_create_reports_each_item(users):
+    owner, _ = users
+    taken = f"batch-{uuid.uuid4()}"
+    fresh = f"batch-{uuid.uuid4()}"
+    with app.test_client() as client:
+        create(client, owner, taken)
+        response = client.post("/v3/assignments/batch", headers=owner, json=[
+            assignment_body(fresh),
+            assignment_body(f"batch-{uuid.uuid4()}", points=500),
+            assignment_body(fresh),
+            assignment_body(taken),
+        ])
+        assert statuses(response) == [201, 400, 400, 400]
+        created = response.get_json()[0]["assignment"]
+        assert created["name"] == fresh
+        assert client.get(f"/v3/assignments/{created['id']}", headers=owner).status_code == 200
+
+def test_batch_update_reports_each_item(users):
+    owner, other = users
+    with app.test_client() as client:
+        mine, second = create(client, owner, f"batch-{uuid.uuid4()}", f"batch-{uuid.uuid4()}")
+        (theirs,) = create(client, other, f"batch-{uuid.uuid4()}")
+        response = client.put("/v3/assignments/batch", headers=owner, json=[
+            dict(assignment_body(f"batch-{uuid.uuid4()}", points=42), id=mine),
+            dict(assignment_body(f"batch-{uuid.uuid4()}"), id="not-a-uuid"),
+            dict(assignment_body(f"batch-{uuid.uuid4()}"), id=mine),
+            dict(assignment_body(f"batch-{uuid.uuid4()}"), id=theirs),
+            dict(assignment_body(f"batch-{uuid.uuid4()}"), id=str(uuid.uuid4())),
+            dict(assignment_body(f"batch-{uuid.uuid4()}", points=0), id=second),
+        ])
+        assert statuses(response) == [204, 400, 400, 403, 404, 400]
+        assert client.get(f"/v3/assignments/{mine}", headers=owner).get_json()["points"] == 42
+
+def test_batch_delete_reports_each_item(users):
+    owner, other = users
+    with app.test_client() as client:
+        mine, submitted = create(client, owner, f"batch-{uuid.uuid4()}", f"batch-{uuid.uuid4()}")
+        (theirs,) = create(client, other, f"batch-{uuid.uuid4()}")
+        with app.app_context():
+            db.session.add(Submissions(submission_url="https://example.com/a.zip", assignment_id=uuid.UUID(submitted)))
+            db.session.commit()
+
+        response = client.delete("/v3/assignments/batch", headers=owner, json=[
+            mine, "not-a-uuid", mine, theirs, str(uuid.uuid4()), submitted,
+        ])
+        assert statuses(response) == [204, 400, 400, 403, 404, 409]
+        assert client.get(f"/v3/assignments/{mine}", headers=owner).status_code == 404
+        with app.app_context():
+            assert db.session.get(Assignments, uuid.UUID(submitted)) is not None
+
+def test_batch_body_must_be_a_bounded_array(users):
+    owner, _ = users
+    with app.test_client() as client:
+        for body in ({}, [], [assignment_body("x")] * 501):
+            assert client.post("/v3/assignments/batch", headers=owner, json=body).status_code == 400
+
+def test_single_update_to_a_taken_name_is_rejected(users):
+    owner, _ = users
+    taken = f"batch-{uuid.uuid4()}"
+    with app.test_client() as client:
+        _, mine = create(client, owner, taken, f"batch-{uuid.uuid4()}")
+        response = client.put(f"/v3/assignments/{mine}", headers=owner, json=assignment_body(taken))
+        assert response.status_code == 400
+        assert response.get_json()["message"] == "Assignment already exist"
+        assert client.put(f"/v3/assignments/{mine}", headers=owner, json=assignment_body(f"batch-{uuid.uuid4()}")).status_code == 204
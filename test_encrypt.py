@@ -0,0 +1,43 @@
+import uuid
+from util.encrypt import Encryption
+from util.queries import Queries
+from util.validations import Validation, credential_cache
+
+class Row():
+    def __init__(self, password):
+        self.id = uuid.uuid4()
+        self.email = "jane.doe@example.com"
+        self.first_name = "Jane"
+        self.last_name = "Doe"
+        self.password = password
+
+def test_rounds_are_configurable_and_parsed():
+    hashed = Encryption.encrypt("secret", rounds=5)
+    assert Encryption.rounds(hashed) == 5
+    assert Encryption.needs_rehash(hashed, rounds=6)
+    assert not Encryption.needs_rehash(hashed, rounds=5)
+    assert Encryption.rounds("not a hash") is None
+
+def test_login_rehashes_to_configured_cost(monkeypatch):
+    monkeypatch.setattr("util.encrypt.BCRYPT_ROUNDS", 5)
+    row = Row(Encryption.encrypt("secret", rounds=4))
+    replaced = []
+    monkeypatch.setattr(Queries, "credentials", staticmethod(lambda email: row))
+    monkeypatch.setattr(Queries, "replace_password_hash",
+                        staticmethod(lambda user_id, old, new: replaced.append((user_id, old, new)) or True))
+    credential_cache.clear()
+
+    assert Validation.validate_user(row.email, "secret").id == row.id
+    assert len(replaced) == 1
+    user_id, old, new = replaced[0]
+    assert (user_id, old) == (row.id, row.password)
+    assert Encryption.rounds(new) == 5 and Validation.isValidPassword("secret", new)
+
+    # Already at the configured cost, or wrong password: nothing is rewritten
+    row.password = new
+    credential_cache.clear()
+    Validation.validate_user(row.email, "secret")
+    credential_cache.clear()
+    assert Validation.validate_user(row.email, "wrong") is None
+    assert len(replaced) == 1
+    credential_cache.clear()
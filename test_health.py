@@ -0,0 +1,48 @@
+import json
+import time
+from flask import Flask
+from util.health import Check, HealthChecker
+
+def ok(app):
+    return {"detail": 1}
+
+def broken(app):
+    raise RuntimeError("down")
+
+def test_shallow_reads_cached_report():
+    calls = []
+    def counted(app):
+        calls.append(1)
+        return {}
+
+    checker = HealthChecker(Flask(__name__), checks=(Check('db', counted),), interval=60)
+    try:
+        for _ in range(50):
+            report = checker.current()
+        assert report.healthy
+        assert json.loads(report.body) == {"message": "Endpoint is healthy"}
+        assert len(calls) == 1
+    finally:
+        checker.stop()
+
+def test_critical_failure_is_unhealthy_and_optional_is_degraded():
+    checker = HealthChecker(Flask(__name__), checks=(Check('db', ok), Check('sns', broken, critical=False)))
+    report = checker.run_checks()
+    assert report.healthy
+    assert report.detail["status"] == "degraded"
+    assert report.detail["checks"]["sns"] == {"status": "fail", "error": "down", "latency_ms": report.detail["checks"]["sns"]["latency_ms"]}
+    assert report.detail["checks"]["db"]["detail"] == 1
+
+    checker = HealthChecker(Flask(__name__), checks=(Check('db', broken),))
+    assert not checker.run_checks().healthy
+
+def test_stale_report_is_unhealthy():
+    checker = HealthChecker(Flask(__name__), checks=(Check('db', ok),), interval=60, max_age=0.05)
+    try:
+        assert checker.current().healthy
+        time.sleep(0.1)
+        report = checker.current()
+        assert not report.healthy
+        assert report.detail["status"] == "stale"
+    finally:
+        checker.stop()
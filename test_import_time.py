@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+# Importing the app is on the path of every worker boot, restart and test
+# run. The budget is deliberately loose for slow CI hosts; the module and
+# thread checks are what catch regressions precisely.
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', 1500))
+DEFERRED_MODULES = ("pandas", "numpy", "boto3", "botocore", "requests", "validators")
+
+PROBE = """
+import sys, threading, time
+start = time.perf_counter()
+import app
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed)
+print(",".join(name for name in {modules!r} if name in sys.modules))
+print(threading.active_count())
+"""
+
+def import_app():
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(modules=DEFERRED_MODULES)],
+                            cwd=root, capture_output=True, text=True, check=True)
+    elapsed, loaded, threads = result.stdout.strip().splitlines()[-3:]
+    # Cumulative microseconds for the app module itself, from -X importtime
+    cumulative = [int(line.split("|")[1]) for line in result.stderr.splitlines()
+                  if line.startswith("import time:") and line.split("|")[2].strip() == "app"]
+    return float(elapsed), [name for name in loaded.split(",") if name], int(threads), cumulative[0] / 1000
+
+def test_app_import_is_lazy_and_within_budget():
+    elapsed, loaded, threads, importtime_ms = import_app()
+    assert loaded == [], f"Heavy modules imported eagerly: {loaded}"
+    assert threads == 1, "Importing the app started background threads"
+    assert importtime_ms < IMPORT_BUDGET_MS, f"import app took {importtime_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+    assert elapsed < IMPORT_BUDGET_MS
@@ -0,0 +1,66 @@
+from flask import Flask, g
+from sqlalchemy import create_engine
+from util import metrics as metrics_module
+from util.metrics import metrics, timed, init_app
+from util.db_pool import InstrumentedQueuePool, register_pool_metrics
+
+class RecordingPipeline():
+    def __init__(self, sent):
+        self.stats = []
+        self.sent = sent
+
+    def incr(self, stat, count=1, rate=1):
+        self.stats.append(("incr", stat))
+
+    def timing(self, stat, delta, rate=1):
+        self.stats.append(("timing", stat))
+
+    def send(self):
+        self.sent.append(self.stats)
+
+def test_request_metrics_are_sent_in_one_batch(monkeypatch):
+    sent = []
+    monkeypatch.setattr(metrics_module.c, "pipeline", lambda: RecordingPipeline(sent))
+    app = Flask(__name__)
+    init_app(app)
+
+    @app.route("/ping")
+    def ping():
+        metrics.incr("ping_counter")
+        with timed("auth"):
+            pass
+        return "pong"
+
+    response = app.test_client().get("/ping")
+    assert response.status_code == 200
+    assert len(sent) == 1
+    stats = [name for _, name in sent[0]]
+    assert "ping_counter" in stats
+    assert "api.ping.GET.200" in stats
+    assert "api.ping.GET.auth" in stats
+
+def test_pool_metrics_survive_dispose_once(monkeypatch):
+    gauges = []
+    monkeypatch.setattr(metrics, 'gauge', lambda stat, value, *args: gauges.append((stat, value)))
+    engine = register_pool_metrics(create_engine("sqlite://", poolclass=InstrumentedQueuePool))
+    for _ in range(3):
+        engine.dispose()
+    with engine.connect():
+        pass
+    assert gauges == [('pool.in_use', 1), ('pool.in_use', 0)]
+
+def test_failed_statements_leave_no_query_timer_behind():
+    app = Flask(__name__)
+    init_app(app)
+    engine = create_engine("sqlite://")
+    with app.test_request_context("/"):
+        app.preprocess_request()
+        with engine.connect() as conn:
+            for _ in range(3):
+                try:
+                    conn.exec_driver_sql("SELECT * FROM missing")
+                except Exception:
+                    pass
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+            assert 'query_start' not in conn.info
+        assert g.metrics_queries == 1
@@ -0,0 +1,73 @@
+import base64
+import uuid
+import pytest
+from flask import g
+from app import app, response_cache
+from util.db import db, Users
+from util.encrypt import Encryption
+from util.migrations import migrate
+
+# Statements each route may issue once the caller's credentials are cached,
+# counted by the per-request query metric (g.metrics_queries)
+BUDGET = {
+    "create": 1,
+    "list": 1,
+    "detail": 1,
+    "detail cached": 0,
+    "update": 1,
+    "submit": 5,
+    "submission status": 1,
+    "stats": 1,
+    "delete": 1,
+}
+
+@pytest.fixture
+def auth(monkeypatch):
+    monkeypatch.setattr(app.extensions['submission_worker'], 'workers', 0)
+    email = f"budget.{uuid.uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        migrate(db.engine)
+        user = Users(first_name="budget", last_name="test", email=email, password=Encryption.encrypt("secret"))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    yield {"Authorization": "Basic " + base64.b64encode(f"{email}:secret".encode()).decode()}
+    with app.app_context():
+        db.session.execute(db.text("DELETE FROM submission_jobs WHERE payload LIKE :email"), {"email": f"%{email}%"})
+        db.session.execute(db.text("DELETE FROM submissions WHERE assignment_id IN (SELECT id FROM assignments WHERE owner_user_id = :id)"), {"id": user_id})
+        db.session.execute(db.text("DELETE FROM assignments WHERE owner_user_id = :id"), {"id": user_id})
+        db.session.execute(db.text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        db.session.commit()
+
+def test_round_trips_per_route(auth):
+    counts = {}
+    with app.test_client() as client:
+        def call(name, method, url, **kwargs):
+            response = client.open(url, method=method, headers=auth, **kwargs)
+            counts[name] = g.metrics_queries
+            return response
+
+        # Warm the credential cache so only the route's own statements count
+        client.get("/v3/assignments?limit=1", headers=auth)
+
+        body = {"name": f"budget-{uuid.uuid4()}", "points": 10, "num_of_attempts": 3, "deadline": "2099-01-01T00:00:00.000Z"}
+        assignment_id = call("create", "POST", "/v3/assignments", json=body).get_json()["id"]
+        call("list", "GET", "/v3/assignments?limit=10")
+        response_cache.invalidate(f"assignment:{assignment_id}")
+        call("detail", "GET", f"/v3/assignments/{assignment_id}")
+        call("detail cached", "GET", f"/v3/assignments/{assignment_id}")
+        assert call("update", "PUT", f"/v3/assignments/{assignment_id}", json=dict(body, points=20)).status_code == 204
+        submission = call("submit", "POST", f"/v3/assignments/{assignment_id}/submission",
+                          json={"submission_url": "https://example.com/budget.zip"})
+        assert submission.status_code == 202
+        call("submission status", "GET", submission.headers["Location"])
+        stats = call("stats", "GET", f"/v3/assignments/{assignment_id}/stats")
+        assert stats.get_json()["total_submissions"] == 1
+        assert stats.get_json()["by_status"]["pending"] == 1
+
+        # Submissions keep their assignment from being deleted, so delete a fresh one
+        spare = client.post("/v3/assignments", headers=auth, json=dict(body, name=f"budget-{uuid.uuid4()}")).get_json()["id"]
+        assert call("delete", "DELETE", f"/v3/assignments/{spare}").status_code == 204
+
+    over = {name: count for name, count in counts.items() if count > BUDGET[name]}
+    assert not over, f"Routes over their round-trip budget: {over} (budget {BUDGET})"
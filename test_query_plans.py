@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+import pytest
+from sqlalchemy import text
+from app import app
+from util.db import db
+from util.migrations import migrate
+
+# The hot lookups in app.py, written out as the SQL they issue
+HOT_QUERIES = {
+    "assignment by name": ("SELECT * FROM assignments WHERE name = :name LIMIT 1", {"name": "x"}),
+    "attempts per assignment": ("SELECT count(*) FROM submissions WHERE assignment_id = :id", {"id": uuid.uuid4()}),
+    "assignments by owner": ("SELECT id FROM assignments WHERE owner_user_id = :id", {"id": uuid.uuid4()}),
+    "assignment list page": (
+        "SELECT * FROM assignments WHERE (assignment_created, id) > (:created, :id) "
+        "ORDER BY assignment_created, id LIMIT 101", {"created": datetime(2024, 1, 1), "id": uuid.uuid4()}),
+}
+
+@pytest.fixture
+def connection():
+    with app.app_context():
+        migrate(db.engine)
+        with db.engine.connect() as conn:
+            trans = conn.begin()
+            # With sequential scans priced out, the planner only picks one when
+            # no usable index exists
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            yield conn
+            trans.rollback()
+
+def scanned_tables(plan, kind):
+    found = []
+    if plan.get("Node Type") == kind:
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found.extend(scanned_tables(child, kind))
+    return found
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_lookups_use_indexes(connection, name):
+    sql, params = HOT_QUERIES[name]
+    plan = connection.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()[0]["Plan"]
+    assert scanned_tables(plan, "Seq Scan") == [], f"{name} falls back to a sequential scan"
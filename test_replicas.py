@@ -0,0 +1,144 @@
+import base64
+import os
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, insert, table, column, text
+from sqlalchemy.pool import QueuePool
+from util.db import db
+from util.replicas import ReplicaPool, ReplicaRouter, RecentWriters, replica_reads
+
+# SQLite files stand in for the primary and the replicas; each one answers
+# "SELECT name FROM source" with its own name
+
+def make_database(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE source (name TEXT)"))
+        conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+    engine.dispose()
+    return f"sqlite:///{path}"
+
+def stand_in(uri):
+    return create_engine(uri, poolclass=QueuePool)
+
+def auth(email):
+    return {'Authorization': 'Basic ' + base64.b64encode(f"{email}:secret".encode()).decode()}
+
+@pytest.fixture
+def lag():
+    return {}
+
+@pytest.fixture
+def app(tmp_path, lag):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = make_database(tmp_path / "primary.db", "primary")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    uris = [make_database(tmp_path / f"replica{i}.db", f"replica{i}") for i in range(2)]
+    pool = ReplicaPool(uris, check_interval=0, max_lag=5, engine_factory=stand_in,
+                       lag_probe=lambda engine: lag.get(engine.url.database.rsplit('/', 1)[-1], 0))
+    ReplicaRouter(pool, read_endpoints=('read', 'write'), recent_writers=RecentWriters(ttl=60)).init_app(app)
+
+    def source():
+        return db.session.execute(text("SELECT name FROM source")).scalar()
+
+    @app.route('/read')
+    def read():
+        return source()
+
+    @app.route('/auth')
+    def auth_lookup():
+        with replica_reads():
+            return source()
+
+    @app.route('/other')
+    def other():
+        return source()
+
+    @app.route('/write', methods=['POST'])
+    def write():
+        # Routed like a read view, but the INSERT itself goes to the primary
+        db.session.execute(insert(table('source', column('name'))).values(name='written'))
+        db.session.commit()
+        return source(), 201
+
+    @app.route('/written')
+    def written():
+        return str(db.session.execute(text("SELECT count(*) FROM source WHERE name = 'written'")).scalar())
+
+    yield app
+    with app.app_context():
+        db.session.remove()
+
+def test_reads_go_to_replicas_round_robin(app):
+    client = app.test_client()
+    assert [client.get('/read').text for _ in range(4)] == ["replica0", "replica1", "replica0", "replica1"]
+    assert client.get('/auth').text.startswith("replica")
+    assert client.get('/other').text == "primary"
+
+def test_writer_reads_from_primary(app):
+    client = app.test_client()
+    assert client.post('/write', headers=auth("a@example.com")).text.startswith("replica")
+    assert client.get('/written').text == "1"
+    assert client.get('/read', headers=auth("A@example.com")).text == "primary"
+    assert client.get('/auth', headers=auth("a@example.com")).text == "primary"
+    assert client.get('/read', headers=auth("b@example.com")).text.startswith("replica")
+
+def test_lagging_replica_dropped_from_rotation(app, lag):
+    client = app.test_client()
+    pool = app.extensions['replicas'].pool
+    lag["replica0.db"] = 30
+    pool.check_lag()
+    assert {client.get('/read').text for _ in range(4)} == {"replica1"}
+
+    lag["replica1.db"] = 30
+    pool.check_lag()
+    assert client.get('/read').text == "primary"
+
+    lag.clear()
+    pool.check_lag()
+    assert {client.get('/read').text for _ in range(4)} == {"replica0", "replica1"}
+
+def test_unreachable_replica_dropped(tmp_path):
+    def probe(engine):
+        raise RuntimeError("connection refused")
+
+    pool = ReplicaPool([make_database(tmp_path / "r.db", "r")], check_interval=0, engine_factory=stand_in, lag_probe=probe)
+    assert pool.pick() is None
+    assert not pool.replicas()[0].healthy
+
+def test_least_connections(tmp_path):
+    uris = [make_database(tmp_path / f"r{i}.db", f"r{i}") for i in range(2)]
+    pool = ReplicaPool(uris, policy='least_connections', check_interval=0, engine_factory=stand_in, lag_probe=lambda engine: 0)
+    busy = pool.pick()
+    with busy.connect():
+        assert pool.pick() is not busy
+    assert pool.pick() is busy
+
+def test_no_replicas_means_primary(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = make_database(tmp_path / "primary.db", "primary")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    ReplicaRouter(ReplicaPool([])).init_app(app)
+
+    @app.route('/read')
+    def read():
+        return db.session.execute(text("SELECT name FROM source")).scalar()
+
+    assert app.test_client().get('/read').text == "primary"
+
+def test_writes_are_seen_by_forked_workers():
+    writers = RecentWriters(ttl=60)
+    pid = os.fork()
+    if pid == 0:
+        writers.mark("a@example.com")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert writers.recent("a@example.com")
+    assert not writers.recent("b@example.com")
+
+def test_write_marks_expire():
+    writers = RecentWriters(ttl=0)
+    writers.mark("a@example.com")
+    assert not writers.recent("a@example.com")
@@ -0,0 +1,52 @@
+import os
+from datetime import datetime
+from util.response_cache import ResponseCache, CachedResponse, DictBackend
+
+def make_response(body=b'{"id": 1}'):
+    return CachedResponse(body, "1-20240101", datetime(2024, 1, 1))
+
+def test_local_tier_lru_and_ttl():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, make_response())
+    assert cache.get("a") is None
+    assert cache.get("c").body == b'{"id": 1}'
+
+    expired = ResponseCache(maxsize=2, ttl=0)
+    expired.set("a", make_response())
+    assert expired.get("a") is None
+
+def test_shared_tier_is_read_through_and_invalidated():
+    shared = DictBackend()
+    writer = ResponseCache(shared=shared)
+    reader = ResponseCache(shared=shared)
+    writer.set("assignment:1", make_response())
+
+    entry = reader.get("assignment:1")
+    assert entry.etag == "1-20240101"
+    assert entry.last_modified == datetime(2024, 1, 1)
+
+    writer.invalidate("assignment:1")
+    assert shared.get("assignment:1") is None
+    assert writer.get("assignment:1") is None
+
+def test_invalidation_reaches_forked_processes():
+    cache = ResponseCache()
+    cache.set("assignment:1", make_response())
+    pid = os.fork()
+    if pid == 0:
+        cache.invalidate("assignment:1")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert cache.get("assignment:1") is None
+
+def test_fill_racing_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    generation = cache.generation("assignment:1")
+    # A write commits and invalidates while the old row is being loaded
+    cache.invalidate("assignment:1")
+    cache.set("assignment:1", make_response(), generation=generation)
+    assert cache.get("assignment:1") is None
+
+    cache.set("assignment:1", make_response(), generation=cache.generation("assignment:1"))
+    assert cache.get("assignment:1") is not None
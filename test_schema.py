@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+import pytest
+from util.schema import ASSIGNMENT_SCHEMA, SUBMISSION_SCHEMA, parse_deadline
+from util.validations import Validation
+
+VALID = {"name": "Assignment 1", "points": 10, "num_of_attempts": 3, "deadline": "2030-08-29T09:12:33.001Z"}
+
+ASSIGNMENTS = [
+    VALID,
+    {"name": "a", "points": 10, "num_of_attempts": 3},
+    dict(VALID, extra=1),
+    dict(VALID, name=""),
+    dict(VALID, name=7),
+    dict(VALID, deadline="2030-08-29"),
+    dict(VALID, deadline="2030-02-30T09:12:33.001Z"),
+    dict(VALID, points=0),
+    dict(VALID, num_of_attempts=101),
+]
+
+SUBMISSIONS = [
+    {"submission_url": "https://example.com/file.zip"},
+    {},
+    {"submission_url": "https://example.com/file.zip", "extra": 1},
+    {"submission_url": "https://example.com/file.tar"},
+    {"submission_url": ""},
+]
+
+@pytest.mark.parametrize("data", ASSIGNMENTS)
+def test_assignment_messages_match_legacy(data):
+    payload, message = ASSIGNMENT_SCHEMA.parse(data)
+    assert message == Validation.isAssignDataValid(data)
+    assert (payload is None) == (message != "")
+
+@pytest.mark.parametrize("data", SUBMISSIONS)
+def test_submission_messages_match_legacy(data):
+    payload, message = SUBMISSION_SCHEMA.parse(data)
+    assert message == Validation.isSubDataValid(data)
+
+def test_payload_is_typed():
+    payload, _ = ASSIGNMENT_SCHEMA.parse(VALID)
+    assert payload.deadline == datetime(2030, 8, 29, 9, 12, 33, 1000, tzinfo=timezone.utc)
+    assert payload.points == 10
+    with pytest.raises(AttributeError):
+        payload.other = 1
+
+def test_bad_types_do_not_raise():
+    assert ASSIGNMENT_SCHEMA.parse(dict(VALID, points="10"))[1] == "Invalid type: points must be an integer"
+    assert ASSIGNMENT_SCHEMA.parse(dict(VALID, deadline=5))[0] is None
+    assert SUBMISSION_SCHEMA.parse({"submission_url": 5})[1] == "Type error: Submission URL should be string"
+    assert parse_deadline("2030-08-29T09:12:33.1234567Z") is None
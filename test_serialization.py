@@ -0,0 +1,40 @@
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from flask import Flask, jsonify
+from app_logging import CustomFormatter
+from util.serialization import FastJSONProvider, dumps, loads, encode_rows
+
+ROW = (uuid.UUID("5b8e1c0e-3c1f-4c57-9f0e-3a0c4b7c2f11"), "Assignment 01", 10, 3,
+       datetime(2024, 11, 1, 9, 29, 29, 500, tzinfo=timezone.utc))
+KEYS = ("id", "name", "points", "num_of_attempts", "deadline")
+
+def test_rows_encode_like_isoformat_and_str():
+    body = encode_rows([ROW], KEYS)
+    assert isinstance(body, bytes)
+    assert loads(body) == [{
+        "id": str(ROW[0]),
+        "name": "Assignment 01",
+        "points": 10,
+        "num_of_attempts": 3,
+        "deadline": ROW[4].isoformat()
+    }]
+
+def test_provider_backs_jsonify():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    with app.app_context():
+        res = jsonify(dict(zip(KEYS, ROW)))
+    assert res.mimetype == "application/json"
+    assert json.loads(res.get_data()) == loads(dumps(dict(zip(KEYS, ROW))))
+
+def test_formatter_splices_encoded_body():
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "Returned", None, None)
+    record.body = dumps({"id": 1})
+    line = CustomFormatter().format(record)
+    assert json.loads(line.split(": ", 1)[1])["body"] == {"id": 1}
+
+    record.body = dumps({"name": "x" * 100})
+    line = CustomFormatter(max_message_bytes=10).format(record)
+    assert "[truncated" in json.loads(line.split(": ", 1)[1])["body"]
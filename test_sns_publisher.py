@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+import pytest
+from util.sns_publisher import SNSBatchPublisher, PublishFailed, PublisherFull
+
+class StubSNS():
+    # Stand-in for the SNS endpoint: fails the first `transient` entries with a
+    # retryable error and any entry whose message asks for a sender fault
+    def __init__(self, transient=0):
+        self.batches = []
+        self.transient = transient
+
+    def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+        self.batches.append(PublishBatchRequestEntries)
+        ok, failed = [], []
+        for entry in PublishBatchRequestEntries:
+            message = json.loads(json.loads(entry["Message"])["default"])
+            if message.get("bad"):
+                failed.append({"Id": entry["Id"], "Code": "InvalidParameter", "Message": "bad", "SenderFault": True})
+            elif self.transient > 0:
+                self.transient -= 1
+                failed.append({"Id": entry["Id"], "Code": "InternalError", "Message": "try again", "SenderFault": False})
+            else:
+                ok.append({"Id": entry["Id"], "MessageId": f"m-{entry['Id']}"})
+        return {"Successful": ok, "Failed": failed}
+
+def test_batches_by_size():
+    sns = StubSNS()
+    publisher = SNSBatchPublisher(client=sns, topic_arn="arn:test", window=0.5)
+    futures = [publisher.publish({"n": i}) for i in range(25)]
+    assert all(f.result(5) for f in futures)
+    publisher.close()
+    assert sum(len(b) for b in sns.batches) == 25
+    assert max(len(b) for b in sns.batches) == 10
+
+def test_retries_transient_and_fails_sender_fault():
+    sns = StubSNS(transient=2)
+    publisher = SNSBatchPublisher(client=sns, topic_arn="arn:test", backoff=0)
+    good = publisher.publish({"n": 1})
+    bad = publisher.publish({"bad": True})
+    assert good.result(5)
+    with pytest.raises(PublishFailed):
+        bad.result(5)
+    publisher.close()
+
+def test_close_flushes_buffer():
+    sns = StubSNS()
+    publisher = SNSBatchPublisher(client=sns, topic_arn="arn:test", window=10)
+    future = publisher.publish({"n": 1})
+    publisher.close()
+    assert future.done()
+
+def test_backpressure():
+    release = threading.Event()
+
+    class SlowSNS(StubSNS):
+        def publish_batch(self, **kwargs):
+            release.wait(5)
+            return super().publish_batch(**kwargs)
+
+    publisher = SNSBatchPublisher(client=SlowSNS(), topic_arn="arn:test", window=0, max_queue=1, put_timeout=0.2)
+    publisher.publish({"n": 1})
+    time.sleep(0.2)  # sender thread is now stuck in publish_batch
+    publisher.publish({"n": 2})
+    with pytest.raises(PublisherFull):
+        publisher.publish({"n": 3})
+    release.set()
+    publisher.close()
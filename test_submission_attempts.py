@@ -0,0 +1,86 @@
+import base64
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import app
+from util.db import db, Users, Assignments, SubmissionAttempts, SubmissionStats
+from util.encrypt import Encryption
+from util.migrations import migrate
+
+ATTEMPT_LIMIT = 3
+PARALLEL_SUBMISSIONS = 20
+
+@pytest.fixture
+def assignment(monkeypatch):
+    # Background probing and admission control are not under test here
+    monkeypatch.setattr(app.extensions['submission_worker'], 'workers', 0)
+    monkeypatch.setattr(app.extensions['admission'], 'enabled', False)
+    email = f"load.{uuid.uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        migrate(db.engine)
+        user = Users(first_name="load", last_name="test", email=email, password=Encryption.encrypt("secret"))
+        db.session.add(user)
+        db.session.flush()
+        assign = Assignments(name=f"load-{uuid.uuid4()}", points=10, num_of_attempts=ATTEMPT_LIMIT,
+                             deadline=datetime.now(timezone.utc) + timedelta(days=1), owner_user_id=user.id)
+        db.session.add(assign)
+        db.session.commit()
+        ids = (user.id, assign.id)
+    yield email, ids
+    with app.app_context():
+        db.session.execute(db.text("DELETE FROM submission_jobs WHERE submission_id IN (SELECT id FROM submissions WHERE assignment_id = :id)"), {"id": ids[1]})
+        db.session.execute(db.text("DELETE FROM submissions WHERE assignment_id = :id"), {"id": ids[1]})
+        db.session.execute(db.text("DELETE FROM assignments WHERE id = :id"), {"id": ids[1]})
+        db.session.execute(db.text("DELETE FROM users WHERE id = :id"), {"id": ids[0]})
+        db.session.commit()
+
+def test_parallel_submissions_never_exceed_limit(assignment):
+    email, (user_id, assignment_id) = assignment
+    auth = "Basic " + base64.b64encode(f"{email}:secret".encode()).decode()
+
+    def submit(i):
+        with app.test_client() as client:
+            response = client.post(f"/v3/assignments/{assignment_id}/submission",
+                                   json={"submission_url": f"https://example.com/{i}.zip"},
+                                   headers={"Authorization": auth})
+            return response.status_code
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_SUBMISSIONS) as pool:
+        statuses = list(pool.map(submit, range(PARALLEL_SUBMISSIONS)))
+
+    assert statuses.count(202) == ATTEMPT_LIMIT
+    assert statuses.count(400) == PARALLEL_SUBMISSIONS - ATTEMPT_LIMIT
+    with app.app_context():
+        counter = SubmissionAttempts.query.filter_by(user_id=user_id, assignment_id=assignment_id).one()
+        assert counter.attempts == ATTEMPT_LIMIT
+        # Only accepted submissions are counted, and the user once
+        stats = db.session.get(SubmissionStats, assignment_id)
+        assert (stats.total, stats.submitters, stats.pending) == (ATTEMPT_LIMIT, 1, ATTEMPT_LIMIT)
+
+@pytest.fixture
+def stranger():
+    email = f"other.{uuid.uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        user = Users(first_name="other", last_name="test", email=email, password=Encryption.encrypt("secret"))
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    yield "Basic " + base64.b64encode(f"{email}:secret".encode()).decode()
+    with app.app_context():
+        db.session.execute(db.text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        db.session.commit()
+
+def test_submission_status_is_private(assignment, stranger):
+    email, (user_id, assignment_id) = assignment
+    auth = {"Authorization": "Basic " + base64.b64encode(f"{email}:secret".encode()).decode()}
+    with app.test_client() as client:
+        submitted = client.post(f"/v3/assignments/{assignment_id}/submission",
+                                json={"submission_url": "https://example.com/private.zip"}, headers=auth)
+        location = submitted.headers["Location"]
+        assert client.get(location, headers=auth).status_code == 200
+        assert client.get(location, headers={"Authorization": stranger}).status_code == 403
+        submission_id = submitted.get_json()["id"]
+        for path in (f"/v3/assignments/not-a-uuid/submission/{submission_id}",
+                     f"/v3/assignments/{assignment_id}/submission/not-a-uuid"):
+            assert client.get(path, headers=auth).status_code == 404
@@ -0,0 +1,82 @@
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from util.submission_worker import SubmissionWorker
+from util.sns_publisher import SNSBatchPublisher, PublisherFull, PublishFailed
+from util.url_verifier import VerifierBusy
+
+class ZipHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/ok.zip":
+            self.send_response(200)
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"PK\x03\x04")
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class StubSNS():
+    def __init__(self):
+        self.published = []
+        self.batches = []
+
+    def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+        self.batches.append(len(PublishBatchRequestEntries))
+        self.published.extend(PublishBatchRequestEntries)
+        return {"Successful": [{"Id": e["Id"], "MessageId": e["Id"]} for e in PublishBatchRequestEntries], "Failed": []}
+
+@pytest.fixture
+def file_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ZipHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_resolve_publishes_final_status(file_server):
+    sns = StubSNS()
+    worker = SubmissionWorker(app=None, workers=0, publisher=SNSBatchPublisher(client=sns, topic_arn="arn:test"))
+    payload = {"submission_url": f"{file_server}/ok.zip", "email": "jane.doe@example.com"}
+
+    status, future = worker.resolve("pending", payload)
+    assert status == "valid"
+    future.result(5)
+    status, future = worker.resolve("invalid_url", payload)
+    assert status == "invalid_url"
+    future.result(5)
+    assert len(sns.published) == 2
+    assert '\\"status\\": \\"valid\\"' in sns.published[0]["Message"]
+    assert sns.published[0]["MessageStructure"] == "json"
+
+def test_lost_lease_publishes_nothing():
+    sns = StubSNS()
+    worker = SubmissionWorker(app=None, workers=0, probe=lambda url: "valid",
+                              publisher=SNSBatchPublisher(client=sns, topic_arn="arn:test"))
+    # Another thread reclaimed the job while this one was probing
+    status, future = worker.resolve("pending", {"submission_url": "x", "email": "a@example.com"}, renew=lambda: False)
+    assert (status, future) == ("valid", None)
+    assert sns.published == []
+
+def test_resolve_does_not_wait_so_jobs_share_batches():
+    sns = StubSNS()
+    worker = SubmissionWorker(app=None, workers=0, publisher=SNSBatchPublisher(client=sns, topic_arn="arn:test", window=0.5))
+    futures = [worker.resolve("invalid_url", {"submission_url": "x", "email": f"{i}@example.com"})[1] for i in range(10)]
+    for future in futures:
+        future.result(5)
+    assert sns.batches == [10]
+
+def test_transient_errors_retry_with_capped_backoff():
+    worker = SubmissionWorker(app=None, workers=0, max_attempts=5, max_backoff=300)
+    for error in (VerifierBusy("busy"), PublisherFull("full"), PublishFailed("RetriesExhausted", "down"), ConnectionError()):
+        assert worker.retry_delay(1, error) == 2
+        assert worker.retry_delay(50, error) == 300
+
+def test_bad_jobs_park_after_max_attempts():
+    worker = SubmissionWorker(app=None, workers=0, max_attempts=5)
+    for error in (PublishFailed("InvalidParameter", "bad"), KeyError("submission_url")):
+        assert worker.retry_delay(4, error) == 16
+        assert worker.retry_delay(5, error) is None
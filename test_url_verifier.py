@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from util.url_verifier import UrlVerifier, VerifierBusy
+
+class FileHandler(BaseHTTPRequestHandler):
+    # /head.zip answers HEAD; everything else only answers GET, like
+    # BaseHTTPRequestHandler's default 501 for HEAD
+    requests = []
+    delay = 0
+
+    def do_HEAD(self):
+        FileHandler.requests.append(("HEAD", self.path))
+        if self.path != "/head.zip":
+            self.send_response(501)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "4")
+        self.end_headers()
+
+    def do_GET(self):
+        FileHandler.requests.append(("GET", self.path, self.headers.get("Range")))
+        time.sleep(FileHandler.delay)
+        if self.path == "/missing.zip":
+            self.send_response(404)
+            self.end_headers()
+        elif self.path == "/big.zip":
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes 0-0/5000")
+            self.send_header("Content-Length", "1")
+            self.end_headers()
+            self.wfile.write(b"P")
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", "4")
+            self.end_headers()
+            self.wfile.write(b"PK\x03\x04")
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def file_server():
+    FileHandler.requests = []
+    FileHandler.delay = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+def test_head_first_then_ranged_get(file_server):
+    verifier = UrlVerifier(cache_ttl=0)
+    assert verifier.verify(f"{file_server}/head.zip") == "valid"
+    assert FileHandler.requests == [("HEAD", "/head.zip")]
+
+    assert verifier.verify(f"{file_server}/ok.zip") == "valid"
+    assert FileHandler.requests[-1] == ("GET", "/ok.zip", "bytes=0-0")
+    assert verifier.verify(f"{file_server}/missing.zip") == "no_file"
+
+def test_size_limit_and_unreachable(file_server):
+    verifier = UrlVerifier(max_bytes=1000, cache_ttl=0, retries=0, timeout=0.5)
+    assert verifier.verify(f"{file_server}/big.zip") == "too_large"
+    assert verifier.verify("http://127.0.0.1:9/unreachable.zip") == "no_file"
+
+def test_results_are_cached(file_server):
+    verifier = UrlVerifier(cache_ttl=60)
+    for _ in range(3):
+        assert verifier.verify(f"{file_server}/head.zip") == "valid"
+    assert len(FileHandler.requests) == 1
+
+def test_per_host_limit(file_server):
+    FileHandler.delay = 0.3
+    verifier = UrlVerifier(per_host=1, wait=0.05, cache_ttl=0)
+    slow = threading.Thread(target=verifier.verify, args=(f"{file_server}/ok.zip",))
+    slow.start()
+    time.sleep(0.1)
+    with pytest.raises(VerifierBusy):
+        verifier.verify(f"{file_server}/ok.zip")
+    slow.join()
+    # Idle hosts hold no semaphore
+    assert verifier._host_slots == {}
+
+def test_async_callers(file_server):
+    verifier = UrlVerifier(cache_ttl=0)
+
+    async def run():
+        return await asyncio.gather(verifier.averify(f"{file_server}/ok.zip"),
+                                    verifier.averify(f"{file_server}/missing.zip"))
+
+    assert asyncio.run(run()) == ["valid", "no_file"]
@@ -0,0 +1,156 @@
+import hashlib
+import hmac
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request, jsonify
+from util.encrypt import Encryption
+from util.metrics import metrics
+from app_logging import logger
+
+# Route classes: "auth" is any request whose credentials are not in the
+# credential cache (it will run bcrypt), "probe" submits work that reaches out
+# to the submission host, "read" and "write" are everything else on /v3.
+# "auth_addr" is the per-client-address cap on bcrypt checks.
+ROUTE_CLASSES = {
+    'create_submission': 'probe',
+    'get_assignments': 'read',
+    'get_assignments_details': 'read',
+    'get_submission_status': 'read',
+    'get_submission_stats': 'read',
+}
+DEFAULT_ROUTE_CLASS = 'write'
+
+# (tokens per second, burst) per bucket and route class
+DEFAULT_RATES = {
+    'auth': (float(os.getenv('ADMISSION_AUTH_RATE', 2)), float(os.getenv('ADMISSION_AUTH_BURST', 10))),
+    'auth_addr': (float(os.getenv('ADMISSION_AUTH_ADDR_RATE', 20)), float(os.getenv('ADMISSION_AUTH_ADDR_BURST', 50))),
+    'read': (float(os.getenv('ADMISSION_READ_RATE', 50)), float(os.getenv('ADMISSION_READ_BURST', 100))),
+    'write': (float(os.getenv('ADMISSION_WRITE_RATE', 10)), float(os.getenv('ADMISSION_WRITE_BURST', 20))),
+    'probe': (float(os.getenv('ADMISSION_PROBE_RATE', 1)), float(os.getenv('ADMISSION_PROBE_BURST', 5))),
+}
+
+# Keys the buckets of credentials that are not yet verified. Every process
+# sharing a BucketBackend must use the same secret: set ADMISSION_KEY_SECRET
+# when buckets are shared between hosts. Otherwise the random default is drawn
+# once in the gunicorn master (gunicorn.conf.py imports this module) and
+# inherited by every worker on the host.
+ADMISSION_KEY_SECRET = os.getenv('ADMISSION_KEY_SECRET', '').encode('utf-8') or os.urandom(32)
+
+# Requests of a class in flight at once in this process
+DEFAULT_IN_FLIGHT = {
+    'auth': int(os.getenv('ADMISSION_AUTH_IN_FLIGHT', os.cpu_count() or 2)),
+    'read': int(os.getenv('ADMISSION_READ_IN_FLIGHT', 32)),
+    'write': int(os.getenv('ADMISSION_WRITE_IN_FLIGHT', 16)),
+    'probe': int(os.getenv('ADMISSION_PROBE_IN_FLIGHT', 8)),
+}
+
+
+class BucketBackend():
+    # Token bucket storage. take() spends `cost` tokens from bucket `key` and
+    # returns (allowed, retry_after_seconds). A shared implementation (e.g. a
+    # Redis script) makes the limits hold across worker processes and hosts.
+    def take(self, key, rate, burst, cost=1):
+        raise NotImplementedError
+
+
+class LocalBucketBackend(BucketBackend):
+    # Per-process buckets; least recently used keys are dropped beyond maxsize,
+    # which only ever hands that key a full bucket again
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else (cost - tokens) / rate
+
+
+class AdmissionController():
+    # Decides, before the view runs (so before bcrypt or any query), whether a
+    # /v3 request is admitted: each user has a token bucket per route class
+    # (429 when empty) and each class has an in-flight cap per process (503
+    # when full). Both answers carry Retry-After.
+    def __init__(self, credential_cache, backend=None, rates=None, in_flight=None, prefix='/v3/',
+                 key_secret=ADMISSION_KEY_SECRET):
+        self.credential_cache = credential_cache
+        self.key_secret = key_secret
+        self.backend = backend or LocalBucketBackend()
+        self.rates = rates or DEFAULT_RATES
+        self.prefix = prefix
+        self.enabled = True
+        self._slots = {name: threading.BoundedSemaphore(limit) for name, limit in (in_flight or DEFAULT_IN_FLIGHT).items()}
+
+    def init_app(self, app):
+        app.before_request(self.admit)
+        app.teardown_request(self.release)
+
+    def classify(self, endpoint, auth_header, client):
+        # Returns (route classes the request counts against, [(bucket class, key)]).
+        # Verified (cached) credentials are keyed by email. Anything else is
+        # keyed by an HMAC of the credentials and by client address, never by
+        # the unverified email, so wrong passwords sent under someone's email
+        # cannot drain that user's buckets.
+        route_class = ROUTE_CLASSES.get(endpoint.rsplit('.', 1)[-1], DEFAULT_ROUTE_CLASS)
+        try:
+            email, password = Encryption.decode(auth_header)
+        except Exception:
+            # Malformed or missing credentials are rejected by the view without bcrypt
+            return (route_class,), []
+        credentials = f"{email}:{password}".encode('utf-8')
+        if self.credential_cache.contains(self.credential_cache.key(credentials)):
+            return (route_class,), [(route_class, email.lower())]
+        # Not the credential cache's key: that secret is per process, so the
+        # same credentials would get a different bucket in every worker
+        credentials = hmac.new(self.key_secret, credentials, hashlib.sha256).hexdigest()
+        return ('auth', route_class), [('auth', credentials), ('auth_addr', client), (route_class, credentials)]
+
+    def admit(self):
+        if not self.enabled or not request.path.startswith(self.prefix) or request.endpoint is None:
+            return None
+        classes, buckets = self.classify(request.endpoint, request.headers.get('Authorization', ''),
+                                         request.remote_addr or 'unknown')
+
+        for route_class, key in buckets:
+            rate, burst = self.rates[route_class]
+            allowed, retry_after = self.backend.take(f"{route_class}:{key}", rate, burst)
+            if not allowed:
+                return self._reject(route_class, 429, "Too many requests", retry_after)
+
+        acquired = []
+        for route_class in classes:
+            slots = self._slots.get(route_class)
+            if slots is None:
+                continue
+            if not slots.acquire(blocking=False):
+                for held in acquired:
+                    held.release()
+                return self._reject(route_class, 503, "Server busy, retry later", 1)
+            acquired.append(slots)
+        g.admission_slots = acquired
+        return None
+
+    def release(self, exc=None):
+        for slots in g.pop('admission_slots', ()):
+            slots.release()
+
+    def _reject(self, route_class, status, message, retry_after):
+        metrics.incr(f"admission.{route_class}.{status}")
+        logger.error(message, extra={'method': request.method, 'uri': request.path, 'statusCode': status})
+        res = jsonify({"message": message})
+        res.status_code = status
+        res.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return res
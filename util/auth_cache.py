@@ -0,0 +1,124 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+
+
+class CachedUser():
+    # Lightweight, session-independent copy of the columns handlers read from a user
+    __slots__ = ('id', 'email', 'first_name', 'last_name')
+
+    def __init__(self, id, email, first_name, last_name):
+        self.id = id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+
+    @classmethod
+    def from_row(cls, user):
+        return cls(user.id, user.email, user.first_name, user.last_name)
+
+
+class CredentialCache():
+    # Bounded LRU of recently verified credentials. Keys are an HMAC of the raw
+    # credentials under a per-process secret, so neither the password nor a
+    # reversible form of it is ever held in memory by the cache.
+    def __init__(self, maxsize=1024, ttl=300, secret=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._secret = secret or os.urandom(32)
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.statsd_client = None
+
+    def key(self, credentials):
+        if isinstance(credentials, str):
+            credentials = credentials.encode('utf-8')
+        return hmac.new(self._secret, credentials, hashlib.sha256).digest()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                user = entry[1]
+            else:
+                if entry is not None:
+                    self._discard(key)
+                self.misses += 1
+                user = None
+        self._count('auth_cache.hit' if user is not None else 'auth_cache.miss')
+        return user
+
+    def contains(self, key):
+        # Whether get() would hit, without touching LRU order or the hit stats
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def put(self, key, user):
+        cached = user if isinstance(user, CachedUser) else CachedUser.from_row(user)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, cached)
+            self._keys_by_user.setdefault(cached.id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+        return cached
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _discard(self, key):
+        # Caller must hold the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1].id]
+
+    def _count(self, name):
+        if self.statsd_client is not None:
+            self.statsd_client.incr(name)
+
+
+def register_invalidation(cache, model):
+    # Drop every cached credential for a user as soon as its row is flushed with
+    # changes or deleted. Bulk query.update()/delete() bypass mapper events, so
+    # callers doing those must call cache.invalidate_user() themselves.
+    def _invalidate(mapper, connection, target):
+        cache.invalidate_user(target.id)
+
+    event.listen(model, 'after_update', _invalidate)
+    event.listen(model, 'after_delete', _invalidate)
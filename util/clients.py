@@ -0,0 +1,67 @@
+import os
+import threading
+
+# Outbound clients are created once per process on first use and shared by
+# all threads. The pid is remembered so a forked worker builds its own
+# instead of reusing sockets inherited from the parent.
+_lock = threading.Lock()
+_sns = (None, None)
+_http = (None, None)
+
+SNS_POOL_SIZE = int(os.getenv('SNS_POOL_SIZE', 10))
+SNS_CONNECT_TIMEOUT = float(os.getenv('SNS_CONNECT_TIMEOUT', 2))
+SNS_READ_TIMEOUT = float(os.getenv('SNS_READ_TIMEOUT', 5))
+SNS_MAX_ATTEMPTS = int(os.getenv('SNS_MAX_ATTEMPTS', 3))
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 20))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))
+
+
+def http_timeout():
+    return (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def get_sns_client():
+    global _sns
+    client, pid = _sns
+    if client is not None and pid == os.getpid():
+        return client
+    with _lock:
+        client, pid = _sns
+        if client is None or pid != os.getpid():
+            import boto3
+            from botocore.config import Config
+            # boto3 clients are thread-safe, sessions are not: build from a
+            # private session so concurrent first calls cannot race
+            client = boto3.session.Session().client(
+                'sns',
+                region_name=os.getenv('AWS_REGION'),
+                endpoint_url=os.getenv('SNS_ENDPOINT_URL') or None,
+                config=Config(
+                    max_pool_connections=SNS_POOL_SIZE,
+                    connect_timeout=SNS_CONNECT_TIMEOUT,
+                    read_timeout=SNS_READ_TIMEOUT,
+                    retries={'max_attempts': SNS_MAX_ATTEMPTS, 'mode': 'standard'}
+                )
+            )
+            _sns = (client, os.getpid())
+    return client
+
+
+def get_http_session():
+    global _http
+    session, pid = _http
+    if session is not None and pid == os.getpid():
+        return session
+    with _lock:
+        session, pid = _http
+        if session is None or pid != os.getpid():
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http = (session, os.getpid())
+    return session
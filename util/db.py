@@ -1,12 +1,11 @@
 from datetime import datetime, timezone
-from flask_sqlalchemy import SQLAlchemy
-import psycopg2
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import validates
-import validators
+from util.replicas import RoutingSQLAlchemy
 
-db = SQLAlchemy()
+# Sessions route reads to a replica when the app's ReplicaRouter allows it
+db = RoutingSQLAlchemy()
 
 class Users(db.Model):
     __tablename__ = 'users'
@@ -20,13 +19,19 @@ class Users(db.Model):
 
 class Assignments(db.Model):
     __tablename__ = 'assignments'
+    # Index names match util/migrations.py, which adds them to existing databases
+    __table_args__ = (
+        db.Index('ix_assignments_name', 'name', unique=True),
+        db.Index('ix_assignments_owner_user_id', 'owner_user_id'),
+        db.Index('ix_assignments_created_id', 'assignment_created', 'id'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     name = db.Column(db.String(100), nullable=False)
     points = db.Column(db.Integer, nullable=False)
     num_of_attempts = db.Column(db.Integer, nullable=False)
     deadline = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
-    assignment_created = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
-    assignment_updated = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    assignment_created = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    assignment_updated = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     owner_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"))
 
     @validates('points')
@@ -43,6 +48,9 @@ class Assignments(db.Model):
 
 class Submissions(db.Model):
     __tablename__ = 'submissions'
+    __table_args__ = (
+        db.Index('ix_submissions_assignment_id', 'assignment_id'),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     submission_url = db.Column(db.String(150), nullable=False)
     submission_date = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
@@ -51,6 +59,50 @@ class Submissions(db.Model):
 
     @validates('submission_url')
     def validate_url(self, key, submission_url):
+        import validators
         if not validators.url(submission_url):
             raise ValueError("Invalid URL format for submission_url")
-        return submission_url
\ No newline at end of file
+        return submission_url
+
+class SubmissionJobs(db.Model):
+    # Durable queue of outbound work for a submission: the URL probe (while
+    # status is pending) and the SNS notification (until published)
+    __tablename__ = 'submission_jobs'
+    __table_args__ = (
+        db.Index('ix_submission_jobs_submission_id', 'submission_id'),
+        db.Index('ix_submission_jobs_available_at', 'available_at', postgresql_where=db.text('NOT published')),
+    )
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    submission_id = db.Column(UUID(as_uuid=True), db.ForeignKey("submissions.id", ondelete="CASCADE"), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    payload = db.Column(db.Text, nullable=False)
+    published = db.Column(db.Boolean, nullable=False, default=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    available_at = db.Column(db.DateTime(timezone=True), nullable=True, default=lambda: datetime.now(timezone.utc))
+    last_error = db.Column(db.Text, nullable=True)
+    job_created = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
+    job_updated = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class SubmissionAttempts(db.Model):
+    # Attempts used per (user, assignment), maintained on every submission so
+    # the limit check is a single-row conditional upsert instead of a count
+    __tablename__ = 'submission_attempts'
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    assignment_id = db.Column(UUID(as_uuid=True), db.ForeignKey("assignments.id", ondelete="CASCADE"), primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+
+class SubmissionStats(db.Model):
+    # Per-assignment submission counters, bumped in the transaction that
+    # inserts a submission and moved between statuses when the worker resolves
+    # it, so the stats endpoint reads one row however many submissions exist
+    __tablename__ = 'submission_stats'
+    assignment_id = db.Column(UUID(as_uuid=True), db.ForeignKey("assignments.id", ondelete="CASCADE"), primary_key=True)
+    total = db.Column(db.BigInteger, nullable=False, default=0)
+    submitters = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.BigInteger, nullable=False, default=0)
+    valid = db.Column(db.BigInteger, nullable=False, default=0)
+    no_file = db.Column(db.BigInteger, nullable=False, default=0)
+    too_large = db.Column(db.BigInteger, nullable=False, default=0)
+    last_submission = db.Column(db.DateTime(timezone=True), nullable=True)
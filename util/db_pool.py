@@ -0,0 +1,55 @@
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from util.metrics import metrics
+
+
+class InstrumentedQueuePool(QueuePool):
+    # Times how long a caller waits for a connection, including waits caused
+    # by the pool being exhausted (pool.checkout_wait, in ms)
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.timing('pool.checkout_wait', (time.perf_counter() - start) * 1000)
+
+
+def register_pool_metrics(engine):
+    # Reports the number of checked-out connections on every checkout and
+    # checkin. Registered once per engine: dispose() hands these listeners to
+    # the replacement pool, and engine.pool is always the current one.
+    if not isinstance(engine.pool, InstrumentedQueuePool):
+        return engine
+
+    def _checkout(*args):
+        metrics.gauge('pool.in_use', engine.pool.checkedout())
+
+    def _checkin(*args):
+        # Fires before the pool counts the connection as returned
+        metrics.gauge('pool.in_use', engine.pool.checkedout() - 1)
+
+    event.listen(engine, 'checkout', _checkout)
+    event.listen(engine, 'checkin', _checkin)
+    return engine
+
+
+def engine_options():
+    # SQLALCHEMY_ENGINE_OPTIONS from the environment. pool_size + max_overflow
+    # should cover gunicorn's threads per worker plus the background workers.
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        # Recycle before RDS/NAT idle timeouts close connections under us
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        # Test each connection on checkout so a failover surfaces as a
+        # reconnect instead of a 500
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', '1') == '1',
+    }
+    statement_timeout = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 5000))
+    if statement_timeout > 0:
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
@@ -1,17 +1,31 @@
 import bcrypt,base64
+import os
+
+# bcrypt work factor for new hashes. Each step doubles the CPU time of every
+# uncached login; benchmarks/bench_bcrypt.py measures it on the host.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
 
 class Encryption():
     @staticmethod
-    def encrypt(password):
-        encrypted_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    def encrypt(password, rounds=None):
+        encrypted_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds or BCRYPT_ROUNDS)).decode('utf-8')
         return encrypted_password
 
+    @staticmethod
+    def rounds(hashed):
+        # Cost stored in a "$2b$<cost>$<salt+hash>" string, or None if unparseable
+        parts = hashed.split("$")
+        if len(parts) != 4 or not parts[2].isdigit():
+            return None
+        return int(parts[2])
+
+    @staticmethod
+    def needs_rehash(hashed, rounds=None):
+        return Encryption.rounds(hashed) != (rounds or BCRYPT_ROUNDS)
+
     @staticmethod
     def decode(auth_header):
         key = base64.b64decode(auth_header.split(" ")[1])
         user_data = key.decode().split(":")
         email, password = user_data[0], user_data[1]
         return email,password
-
-    
-    
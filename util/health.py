@@ -0,0 +1,171 @@
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from sqlalchemy import text
+from util.db import db
+from util.clients import get_sns_client
+from util.metrics import c
+from util.serialization import dumps
+from app_logging import logger
+import app_logging
+
+HEALTH_INTERVAL = float(os.getenv('HEALTH_INTERVAL', 5))
+HEALTH_CONNECT_TIMEOUT = float(os.getenv('HEALTH_CONNECT_TIMEOUT', 2))
+HEALTH_LOG_QUEUE_LIMIT = float(os.getenv('HEALTH_LOG_QUEUE_LIMIT', 0.9))
+
+HEALTHY_BODY = dumps({"message": "Endpoint is healthy"})
+UNHEALTHY_BODY = dumps({"message": "Endpoint is unhealthy"})
+
+
+class Check():
+    # A dependency probe. `probe(app)` returns a detail dict or raises; a
+    # failing critical check makes the app unhealthy (503), any other failing
+    # check only marks it degraded.
+    __slots__ = ('name', 'probe', 'critical')
+
+    def __init__(self, name, probe, critical=True):
+        self.name = name
+        self.probe = probe
+        self.critical = critical
+
+
+def check_database(app):
+    with app.app_context():
+        engine = db.engine
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+        pool = engine.pool
+        return {"pool_in_use": pool.checkedout(), "pool_size": pool.size()}
+
+
+def check_sns(app):
+    # Reachability only: a TCP connect to the SNS endpoint, no API call
+    endpoint = urlsplit(get_sns_client().meta.endpoint_url)
+    port = endpoint.port or (443 if endpoint.scheme == 'https' else 80)
+    socket.create_connection((endpoint.hostname, port), timeout=HEALTH_CONNECT_TIMEOUT).close()
+    return {"endpoint": f"{endpoint.hostname}:{port}"}
+
+
+def check_log_queue(app):
+    log_queue = app_logging.log_queue
+    depth = log_queue.qsize()
+    if log_queue.maxsize and depth >= log_queue.maxsize * HEALTH_LOG_QUEUE_LIMIT:
+        raise RuntimeError(f"Log queue at {depth} of {log_queue.maxsize}")
+    return {"depth": depth, "dropped": app_logging.queue_handler.dropped}
+
+
+DEFAULT_CHECKS = (
+    Check('database', check_database),
+    Check('sns', check_sns, critical=False),
+    Check('log_queue', check_log_queue, critical=False),
+)
+
+
+class HealthReport():
+    __slots__ = ('healthy', 'body', 'detail', 'checked_at')
+
+    def __init__(self, healthy, detail, checked_at):
+        self.healthy = healthy
+        self.detail = detail
+        self.body = HEALTHY_BODY if healthy else UNHEALTHY_BODY
+        self.checked_at = checked_at
+
+
+class HealthChecker():
+    # Runs the checks on a background thread every `interval` seconds and keeps
+    # the last report, so /healthz answers from memory and load balancer
+    # probes never take a pool connection. A report older than `max_age` (the
+    # thread died or a check hangs) counts as unhealthy.
+    def __init__(self, app, checks=DEFAULT_CHECKS, interval=HEALTH_INTERVAL, max_age=None):
+        self.app = app
+        self.checks = checks
+        self.interval = interval
+        self.max_age = max_age or interval * 3
+        self._report = None
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            # Threads do not survive fork, so a forked worker process starts its own
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def current(self):
+        # Last report for the shallow check; the first call in a process runs
+        # the checks inline so there is always something to answer with
+        self.start()
+        report = self._report
+        if report is None:
+            report = self.run_checks()
+        if time.monotonic() - report.checked_at > self.max_age:
+            return HealthReport(False, dict(report.detail, status="stale"), report.checked_at)
+        return report
+
+    def run_checks(self):
+        # Runs every check now; concurrent callers wait for, and share, the
+        # run already in progress
+        started = time.monotonic()
+        with self._run_lock:
+            report = self._report
+            if report is not None and report.checked_at >= started:
+                return report
+
+            healthy = True
+            degraded = False
+            results = {}
+            for check in self.checks:
+                start = time.perf_counter()
+                try:
+                    detail = check.probe(self.app)
+                    result = {"status": "ok", **(detail or {})}
+                except Exception as e:
+                    result = {"status": "fail", "error": str(e)}
+                    if check.critical:
+                        healthy = False
+                    else:
+                        degraded = True
+                result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+                c.timing(f"health.{check.name}", result["latency_ms"])
+                results[check.name] = result
+
+            status = "fail" if not healthy else "degraded" if degraded else "ok"
+            report = HealthReport(healthy, {"status": status, "checks": results}, time.monotonic())
+            self._record(report)
+            return report
+
+    def _record(self, report):
+        previous = self._report
+        self._report = report
+        # Logged on changes only, not once per probe
+        if previous is None or previous.detail["status"] != report.detail["status"]:
+            failing = [name for name, result in report.detail["checks"].items() if result["status"] != "ok"]
+            message = f"Health is {report.detail['status']}" + (f", failing: {', '.join(failing)}" if failing else "")
+            if report.healthy:
+                logger.info(message, extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 200})
+            else:
+                logger.error(message, extra={'method': 'GET', 'uri': '/healthz', 'statusCode': 503})
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.error(f"Health checker error: {e}")
+            self._stopping.wait(self.interval)
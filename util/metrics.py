@@ -0,0 +1,96 @@
+import os
+import time
+from contextlib import contextmanager
+import statsd
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Process-wide statsd client shared by the app and the util modules
+c = statsd.StatsClient(os.getenv('STATSD_HOST', 'localhost'), int(os.getenv('STATSD_PORT', 8125)))
+
+
+class RequestMetrics():
+    # statsd-compatible facade. Inside a request, metrics are collected in that
+    # request's pipeline and sent together (one UDP packet for most requests)
+    # when it ends; outside a request they go straight to the client.
+    def _target(self):
+        if has_request_context():
+            pipeline = g.get('metrics_pipeline')
+            if pipeline is not None:
+                return pipeline
+        return c
+
+    def incr(self, stat, count=1, rate=1):
+        self._target().incr(stat, count, rate)
+
+    def gauge(self, stat, value, rate=1, delta=False):
+        self._target().gauge(stat, value, rate, delta)
+
+    def timing(self, stat, delta, rate=1):
+        self._target().timing(stat, delta, rate)
+
+
+metrics = RequestMetrics()
+
+
+@contextmanager
+def timed(phase):
+    # Times one phase of the current request (auth, db, url_probe, ...). Phase
+    # totals are reported per route in after_request; outside a request the
+    # timing is sent on its own.
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        if has_request_context() and 'metrics_phases' in g:
+            g.metrics_phases[phase] = g.metrics_phases.get(phase, 0) + elapsed
+        else:
+            c.timing(phase, elapsed)
+
+
+# The start time lives on the statement's execution context, so a statement
+# that fails leaves nothing behind on the pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = context._metrics_query_start
+    if has_request_context() and 'metrics_phases' in g:
+        phases = g.metrics_phases
+        phases['db'] = phases.get('db', 0) + (time.perf_counter() - start) * 1000
+        g.metrics_queries += 1
+
+
+def init_app(app):
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_pipeline = c.pipeline()
+        g.metrics_phases = {}
+        g.metrics_queries = 0
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_start' in g:
+            # Blueprint prefixes are dropped so names stay api.<view>.<METHOD>
+            endpoint = (request.endpoint or 'unmatched').rsplit('.', 1)[-1]
+            prefix = f"api.{endpoint}.{request.method}"
+            pipeline = g.metrics_pipeline
+            pipeline.timing(f"{prefix}.{response.status_code}", (time.perf_counter() - g.metrics_start) * 1000)
+            for phase, elapsed in g.metrics_phases.items():
+                pipeline.timing(f"{prefix}.{phase}", elapsed)
+            pipeline.timing(f"{prefix}.queries", g.metrics_queries)
+        return response
+
+    @app.teardown_request
+    def send_request_metrics(exc):
+        pipeline = g.pop('metrics_pipeline', None)
+        if pipeline is not None:
+            pipeline.send()
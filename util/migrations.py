@@ -0,0 +1,126 @@
+from sqlalchemy import text
+from util.db import db, SubmissionAttempts, SubmissionStats
+from app_logging import logger
+
+# Arbitrary constant; serializes concurrent deploys running migrate()
+MIGRATION_LOCK_KEY = 6225
+
+
+def _baseline(conn):
+    # Creates any missing table (with its indexes) from the models. Existing
+    # tables are left alone; changes to them belong in later migrations.
+    db.metadata.create_all(bind=conn)
+
+
+def _submission_stats(conn):
+    # Creates the counters and fills them from the existing rows. Submissions
+    # have no user column, so distinct submitters come from the attempt
+    # counters, which only cover submissions made since migration 8.
+    SubmissionStats.__table__.create(bind=conn, checkfirst=True)
+    conn.execute(text(
+        "INSERT INTO submission_stats "
+        "(assignment_id, total, submitters, pending, valid, no_file, too_large, last_submission) "
+        "SELECT s.assignment_id, count(*), "
+        "(SELECT count(*) FROM submission_attempts a WHERE a.assignment_id = s.assignment_id), "
+        "count(*) FILTER (WHERE j.status = 'pending'), "
+        "count(*) FILTER (WHERE j.status IS NULL OR j.status = 'valid'), "
+        "count(*) FILTER (WHERE j.status = 'no_file'), "
+        "count(*) FILTER (WHERE j.status = 'too_large'), "
+        "max(s.submission_date) AT TIME ZONE 'UTC' "
+        "FROM submissions s LEFT JOIN submission_jobs j ON j.submission_id = s.id "
+        "WHERE s.assignment_id IS NOT NULL "
+        "GROUP BY s.assignment_id "
+        "ON CONFLICT (assignment_id) DO NOTHING"))
+
+
+def _rename_duplicate_assignments(conn):
+    # Before the unique index: names were only checked before insert, so
+    # concurrent creates may have stored duplicates. The oldest assignment
+    # keeps its name; every other copy gets its id appended (within the
+    # 100-character column) and is logged.
+    renamed = conn.execute(text(
+        "UPDATE assignments a SET name = left(a.name, 61) || ' (' || a.id::text || ')' "
+        "FROM (SELECT id, row_number() OVER (PARTITION BY name ORDER BY assignment_created, id) AS n "
+        "      FROM assignments) d "
+        "WHERE a.id = d.id AND d.n > 1 "
+        "RETURNING a.id, a.name")).all()
+    for row in renamed:
+        logger.error(f"Renamed duplicate assignment {row.id} to {row.name!r} before adding ix_assignments_name")
+
+
+def concurrent_index(name, ddl, prepare=None):
+    # CREATE INDEX CONCURRENTLY does not lock writes but cannot run inside a
+    # transaction, and an interrupted build leaves an INVALID index behind that
+    # IF NOT EXISTS would then skip. Drop such a leftover before building.
+    # `prepare(conn)` runs first, e.g. to fix rows a unique index would reject.
+    def apply(conn):
+        if prepare is not None:
+            prepare(conn)
+        invalid = conn.execute(text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"), {"name": name}).first()
+        if invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(ddl))
+    return apply
+
+
+# (version, description, apply). Append only; never edit an applied entry.
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "unique index on assignments.name", concurrent_index(
+        "ix_assignments_name",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_name ON assignments (name)",
+        prepare=_rename_duplicate_assignments)),
+    (3, "index on submissions.assignment_id", concurrent_index(
+        "ix_submissions_assignment_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submissions_assignment_id ON submissions (assignment_id)")),
+    (4, "index on assignments.owner_user_id", concurrent_index(
+        "ix_assignments_owner_user_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_owner_user_id ON assignments (owner_user_id)")),
+    (5, "keyset index for assignment listing", concurrent_index(
+        "ix_assignments_created_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_assignments_created_id ON assignments (assignment_created, id)")),
+    (6, "index on submission_jobs.submission_id", concurrent_index(
+        "ix_submission_jobs_submission_id",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submission_jobs_submission_id ON submission_jobs (submission_id)")),
+    (7, "partial index on unpublished submission_jobs", concurrent_index(
+        "ix_submission_jobs_available_at",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_submission_jobs_available_at ON submission_jobs (available_at) WHERE NOT published")),
+    # Submissions have no user column, so existing ones cannot be attributed;
+    # counters start at zero for attempts made before this migration
+    (8, "per-user submission attempt counters",
+        lambda conn: SubmissionAttempts.__table__.create(bind=conn, checkfirst=True)),
+    (9, "per-assignment submission stats", _submission_stats),
+]
+
+
+def migrate(engine):
+    # Applies pending migrations in order and records each in schema_migrations
+    applied_now = []
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Index builds and backfills on large tables run far longer than the
+        # request statement_timeout; a cancelled build leaves an INVALID index
+        conn.execute(text("SET statement_timeout = 0"))
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "version INTEGER PRIMARY KEY, "
+                "description VARCHAR(200) NOT NULL, "
+                "applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"))
+            applied = {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+            for version, description, apply in MIGRATIONS:
+                if version in applied:
+                    continue
+                logger.info(f"Applying migration {version}: {description}")
+                apply(conn)
+                conn.execute(text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                             {"version": version, "description": description})
+                applied_now.append(version)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            # Back to the connect-time setting before the connection returns to the pool
+            conn.execute(text("RESET statement_timeout"))
+    return applied_now
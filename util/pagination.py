@@ -0,0 +1,36 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+class Pagination():
+    # Opaque keyset cursor over (assignment_created, id): the last row of a page
+    # is encoded and the next page starts strictly after it.
+    @staticmethod
+    def encode_cursor(created, id):
+        raw = json.dumps([created.isoformat(), str(id)]).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created, id = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(created), uuid.UUID(id)
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def parse_limit(value):
+        if value is None:
+            return DEFAULT_PAGE_SIZE
+        try:
+            limit = int(value)
+        except ValueError:
+            return None
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return None
+        return limit
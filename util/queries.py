@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from util.db import db, Users, Assignments, Submissions, SubmissionJobs, SubmissionAttempts, SubmissionStats
+
+# Columns returned to clients for an assignment, in response order
+ASSIGNMENT_COLUMNS = (
+    Assignments.id, Assignments.name, Assignments.points, Assignments.num_of_attempts,
+    Assignments.deadline, Assignments.assignment_created, Assignments.assignment_updated
+)
+ASSIGNMENT_KEYS = tuple(column.key for column in ASSIGNMENT_COLUMNS)
+
+# Statuses a submission settles in once the worker has probed its URL
+RESOLVED_STATUSES = ('valid', 'no_file', 'too_large')
+
+
+class Queries():
+    # Hot-path reads and writes as single statements over just the columns the
+    # handlers use. Results are rows (named tuples), not ORM objects.
+    @staticmethod
+    def credentials(email):
+        return (db.session.query(Users.id, Users.email, Users.first_name, Users.last_name, Users.password)
+                .filter(Users.email == email).first())
+
+    @staticmethod
+    def replace_password_hash(user_id, old_hash, new_hash):
+        # Compare-and-set on its own connection and transaction, so it neither
+        # joins nor commits the request's session. Bypasses mapper events on
+        # purpose: the password itself is unchanged, so cached credentials stay valid.
+        stmt = (update(Users)
+                .where(Users.id == user_id, Users.password == old_hash)
+                .values(password=new_hash))
+        with db.engine.begin() as conn:
+            return conn.execute(stmt).rowcount == 1
+
+    @staticmethod
+    def assignment(id):
+        return db.session.query(*ASSIGNMENT_COLUMNS).filter(Assignments.id == id).first()
+
+    @staticmethod
+    def assignment_owner(id):
+        # (exists, owner_user_id); only used to tell 404 from 403 after a
+        # conditional write matched nothing
+        row = db.session.query(Assignments.owner_user_id).filter(Assignments.id == id).first()
+        return (row is not None, row.owner_user_id if row else None)
+
+    @staticmethod
+    def create_assignment(owner_id, payload):
+        # Returns the new row, or None when the name is taken
+        now = datetime.now(timezone.utc)
+        stmt = (insert(Assignments)
+                .values(id=uuid.uuid4(), name=payload.name, points=payload.points,
+                        num_of_attempts=payload.num_of_attempts, deadline=payload.deadline,
+                        assignment_created=now, assignment_updated=now, owner_user_id=owner_id)
+                .on_conflict_do_nothing(index_elements=[Assignments.name])
+                .returning(*ASSIGNMENT_COLUMNS))
+        return db.session.execute(stmt).first()
+
+    @staticmethod
+    def update_owned_assignment(id, owner_id, payload):
+        # True when the assignment exists and belongs to owner_id
+        stmt = (update(Assignments)
+                .where(Assignments.id == id, Assignments.owner_user_id == owner_id)
+                .values(name=payload.name, points=payload.points, num_of_attempts=payload.num_of_attempts,
+                        deadline=payload.deadline, assignment_updated=datetime.now(timezone.utc))
+                .returning(Assignments.id))
+        return db.session.execute(stmt).first() is not None
+
+    @staticmethod
+    def delete_owned_assignment(id, owner_id):
+        stmt = (delete(Assignments)
+                .where(Assignments.id == id, Assignments.owner_user_id == owner_id)
+                .returning(Assignments.id))
+        return db.session.execute(stmt).first() is not None
+
+    @staticmethod
+    def submission_context(id, email):
+        # The submitting user, the assignment and the attempts already used, in
+        # one round trip. Assignment and attempt columns are None when missing;
+        # the row is None when the user does not exist.
+        stmt = (select(Users.id.label('user_id'), Users.first_name,
+                       Assignments.id.label('assignment_id'), Assignments.deadline, Assignments.num_of_attempts,
+                       SubmissionAttempts.attempts)
+                .select_from(Users)
+                .outerjoin(Assignments, Assignments.id == id)
+                .outerjoin(SubmissionAttempts, and_(SubmissionAttempts.user_id == Users.id,
+                                                    SubmissionAttempts.assignment_id == Assignments.id))
+                .where(Users.email == email))
+        return db.session.execute(stmt).first()
+
+    @staticmethod
+    def submission_status(assignment_id, submission_id):
+        # The submission, its job (status and payload, None for submissions made
+        # before the job queue) and the assignment's owner in one row; None
+        # when the submission does not belong to the assignment
+        stmt = (select(Submissions.id, Submissions.assignment_id, Submissions.submission_url,
+                       Submissions.submission_date, Submissions.submission_updated,
+                       SubmissionJobs.status, SubmissionJobs.payload, Assignments.owner_user_id)
+                .select_from(Submissions)
+                .join(Assignments, Assignments.id == Submissions.assignment_id)
+                .outerjoin(SubmissionJobs, SubmissionJobs.submission_id == Submissions.id)
+                .where(Submissions.id == submission_id, Submissions.assignment_id == assignment_id))
+        return db.session.execute(stmt).first()
+
+    @staticmethod
+    def record_submission(assignment_id, first_submission):
+        # Counts a new pending submission; first_submission is True when the
+        # user had not submitted to this assignment before
+        now = datetime.now(timezone.utc)
+        stmt = insert(SubmissionStats).values(
+            assignment_id=assignment_id, total=1, submitters=int(first_submission), pending=1,
+            valid=0, no_file=0, too_large=0, last_submission=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SubmissionStats.assignment_id],
+            set_={"total": SubmissionStats.total + 1,
+                  "submitters": SubmissionStats.submitters + stmt.excluded.submitters,
+                  "pending": SubmissionStats.pending + 1,
+                  "last_submission": func.greatest(SubmissionStats.last_submission, stmt.excluded.last_submission)})
+        db.session.execute(stmt)
+
+    @staticmethod
+    def resolve_submission(assignment_id, status):
+        # Moves one submission from pending to its final status
+        if status not in RESOLVED_STATUSES:
+            return
+        stmt = (update(SubmissionStats)
+                .where(SubmissionStats.assignment_id == assignment_id, SubmissionStats.pending > 0)
+                .values({status: getattr(SubmissionStats, status) + 1, "pending": SubmissionStats.pending - 1}))
+        db.session.execute(stmt)
+
+    @staticmethod
+    def submission_stats(id):
+        # The assignment's owner and its counters in one row; counter columns
+        # are None before the first submission, the row is None when the
+        # assignment does not exist
+        stmt = (select(Assignments.owner_user_id, SubmissionStats.total, SubmissionStats.submitters,
+                       SubmissionStats.last_submission, SubmissionStats.pending, SubmissionStats.valid,
+                       SubmissionStats.no_file, SubmissionStats.too_large)
+                .select_from(Assignments)
+                .outerjoin(SubmissionStats, SubmissionStats.assignment_id == Assignments.id)
+                .where(Assignments.id == id))
+        return db.session.execute(stmt).first()
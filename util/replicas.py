@@ -0,0 +1,268 @@
+import itertools
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, orm, text
+from util.db_pool import engine_options, register_pool_metrics
+from util.encrypt import Encryption
+from util.metrics import c
+from app_logging import logger
+
+DB_REPLICA_POLICY = os.getenv('DB_REPLICA_POLICY', 'round_robin')
+DB_REPLICA_MAX_LAG = float(os.getenv('DB_REPLICA_MAX_LAG', 5))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', 5))
+DB_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', 10))
+DB_REPLICA_STICKY_SLOTS = int(os.getenv('DB_REPLICA_STICKY_SLOTS', 65536))
+
+# Views whose queries may be answered by a replica
+READ_ENDPOINTS = ('get_assignments', 'get_assignments_details', 'get_submission_stats')
+
+# Seconds of replay lag on a standby. An idle primary writes nothing to
+# replay, so a standby that has replayed everything it received reports 0
+# instead of the age of the last transaction.
+LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END")
+
+
+def postgres_lag(engine):
+    with engine.connect() as conn:
+        return float(conn.execute(LAG_QUERY).scalar())
+
+
+def replica_uris():
+    # DB_REPLICA_HOSTS is a comma-separated list of host[:port]; replicas share
+    # the primary's credentials and database name
+    hosts = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+    return [f"postgresql+psycopg2://{os.getenv('DBUSER')}:{os.getenv('DBPASS')}@"
+            f"{host if ':' in host else host + ':' + os.getenv('DBPORT', '5432')}/{os.getenv('DATABASE')}"
+            for host in hosts]
+
+
+class Replica():
+    __slots__ = ('name', 'engine', 'healthy', 'lag')
+
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag = None
+
+
+class ReplicaPool():
+    # Engines for the read replicas plus the choice of one per request:
+    # "round_robin" rotates, "least_connections" takes the replica with the
+    # fewest checked-out connections in this process. A background thread
+    # measures each replica's lag every `check_interval` seconds and takes a
+    # replica out of rotation while it is unreachable or more than `max_lag`
+    # seconds behind. With no replica in rotation, pick() returns None and
+    # reads go to the primary.
+    def __init__(self, uris=(), policy=DB_REPLICA_POLICY, max_lag=DB_REPLICA_MAX_LAG,
+                 check_interval=DB_REPLICA_CHECK_INTERVAL, engine_factory=None, lag_probe=postgres_lag):
+        if policy not in ('round_robin', 'least_connections'):
+            raise ValueError(f"Unknown replica policy: {policy}")
+        self.uris = list(uris)
+        self.policy = policy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.engine_factory = engine_factory or (lambda uri: register_pool_metrics(create_engine(uri, **engine_options())))
+        self.lag_probe = lag_probe
+        self._replicas = []
+        self._counter = itertools.count()
+        self._pid = None
+        self._checked = False
+        self._stopping = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.uris)
+
+    def replicas(self):
+        # Engines and threads are per process: a forked worker drops the
+        # parent's engines (without closing their sockets) and builds its own
+        with self._lock:
+            if self._pid != os.getpid():
+                for replica in self._replicas:
+                    replica.engine.dispose(close=False)
+                self._replicas = [Replica(f"replica{index}", self.engine_factory(uri))
+                                  for index, uri in enumerate(self.uris)]
+                self._pid = os.getpid()
+                self._checked = False
+                self._thread = None
+            return self._replicas
+
+    def pick(self):
+        replicas = self.replicas()
+        if not replicas:
+            return None
+        if not self._checked:
+            # The first pick in a process measures lag inline, so a lagging
+            # replica is never used before the checker has looked at it
+            self.check_lag()
+            self._start()
+        healthy = [replica for replica in replicas if replica.healthy]
+        if not healthy:
+            c.incr('db.replica.fallback')
+            return None
+        if self.policy == 'least_connections':
+            return min(healthy, key=lambda replica: replica.engine.pool.checkedout()).engine
+        return healthy[next(self._counter) % len(healthy)].engine
+
+    def check_lag(self):
+        for replica in self.replicas():
+            try:
+                lag = self.lag_probe(replica.engine)
+                healthy = lag <= self.max_lag
+                error = f"{lag:.1f}s behind"
+            except Exception as e:
+                lag, healthy, error = None, False, str(e)
+            if lag is not None:
+                c.gauge(f"db.{replica.name}.lag", lag)
+            if healthy != replica.healthy:
+                if healthy:
+                    logger.info(f"Replica {replica.name} back in rotation")
+                else:
+                    logger.error(f"Replica {replica.name} dropped from rotation: {error}")
+            replica.lag = lag
+            replica.healthy = healthy
+        self._checked = True
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _start(self):
+        if self.check_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-lag-checker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.check_interval):
+            try:
+                self.check_lag()
+            except Exception as e:
+                logger.error(f"Replica lag check error: {e}")
+
+
+class RecentWriters():
+    # Users who wrote in the last `ttl` seconds; their reads stay on the primary
+    # so they see their own writes. Marks live in memory shared by every
+    # process forked after the table is created (gunicorn.conf.py imports this
+    # module in the master), so a write through one worker also pins the
+    # user's next read in the others. Users hash into fixed 8-byte slots
+    # holding a deadline on the monotonic clock, which is host-wide on Linux;
+    # users sharing a slot only send extra reads to the primary.
+    def __init__(self, ttl=DB_REPLICA_STICKY_SECONDS, slots=DB_REPLICA_STICKY_SLOTS):
+        self.ttl = ttl
+        self.slots = slots
+        self._memory = mmap.mmap(-1, slots * 8)
+
+    def mark(self, user):
+        struct.pack_into('d', self._memory, self._offset(user), time.monotonic() + self.ttl)
+
+    def recent(self, user):
+        return struct.unpack_from('d', self._memory, self._offset(user))[0] > time.monotonic()
+
+    def _offset(self, user):
+        return zlib.crc32(user.encode('utf-8')) % self.slots * 8
+
+
+# Shared by every worker forked from the process that imported this module
+recent_writes = RecentWriters()
+
+
+class ReplicaRouter():
+    # Decides per request whether reads may use a replica. Requests to
+    # READ_ENDPOINTS read from one replica for the whole request; other views
+    # opt in per block with replica_reads(). Writes always go to the primary,
+    # and a user who wrote recently reads from the primary too.
+    def __init__(self, pool, read_endpoints=READ_ENDPOINTS, recent_writers=None):
+        self.pool = pool
+        self.read_endpoints = set(read_endpoints)
+        self.recent_writers = recent_writers or recent_writes
+
+    def init_app(self, app):
+        app.extensions['replicas'] = self
+        app.before_request(self.route)
+        app.after_request(self.record_write)
+
+    def route(self):
+        user = self._user()
+        g.db_replica_ok = bool(self.pool) and not (user and self.recent_writers.recent(user))
+        endpoint = (request.endpoint or '').rsplit('.', 1)[-1]
+        g.db_route = 'replica' if g.db_replica_ok and endpoint in self.read_endpoints else 'primary'
+
+    def record_write(self, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+            user = self._user()
+            if user:
+                self.recent_writers.mark(user)
+        return response
+
+    def engine(self):
+        # The replica engine for this request's reads, or None for the primary.
+        # Picked once per request so every read sees the same snapshot source.
+        if not has_request_context() or g.get('db_route') != 'replica':
+            return None
+        if 'db_replica_engine' not in g:
+            g.db_replica_engine = self.pool.pick()
+        return g.db_replica_engine
+
+    def _user(self):
+        try:
+            email, _ = Encryption.decode(request.headers.get('Authorization', ''))
+        except Exception:
+            return None
+        return email.lower()
+
+
+@contextmanager
+def replica_reads():
+    # Sends the reads inside the block to a replica when the request may use one
+    if not has_request_context() or not g.get('db_replica_ok'):
+        yield
+        return
+    previous = g.get('db_route')
+    g.db_route = 'replica'
+    try:
+        yield
+    finally:
+        g.db_route = previous
+
+
+def used_replica():
+    return has_request_context() and g.get('db_replica_engine') is not None
+
+
+class RoutingSession(SignallingSession):
+    # Reads go to the engine chosen by the app's ReplicaRouter; flushes and
+    # INSERT/UPDATE/DELETE statements always go to the primary
+    def get_bind(self, mapper=None, clause=None):
+        if not self._flushing and not getattr(clause, 'is_dml', False):
+            router = self.app.extensions.get('replicas')
+            engine = router.engine() if router is not None else None
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_engine(self, sa_url, engine_opts):
+        return register_pool_metrics(create_engine(sa_url, **engine_opts))
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
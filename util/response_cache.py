@@ -0,0 +1,153 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+RESPONSE_CACHE_SLOTS = int(os.getenv('RESPONSE_CACHE_SLOTS', 65536))
+
+
+class CachedResponse():
+    # Pre-serialized JSON body plus the validators sent with it
+    __slots__ = ('body', 'etag', 'last_modified')
+
+    def __init__(self, body, etag, last_modified):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def dumps(self):
+        header = f"{self.etag}\n{self.last_modified.isoformat()}\n".encode('utf-8')
+        return header + self.body
+
+    @classmethod
+    def loads(cls, raw):
+        etag, last_modified, body = raw.split(b"\n", 2)
+        return cls(body, etag.decode('utf-8'), datetime.fromisoformat(last_modified.decode('utf-8')))
+
+
+class SharedCacheBackend():
+    # Interface for a cache shared by every worker (e.g. Redis or memcached).
+    # Values are opaque bytes; implementations must be thread-safe.
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class DictBackend(SharedCacheBackend):
+    # In-memory stand-in for a shared backend, for tests and single-process runs
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._data.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class GenerationTable():
+    # Invalidation generations in memory shared by every process forked after
+    # this module is imported (gunicorn.conf.py imports it in the master).
+    # Keys hash into fixed 8-byte slots. Invalidating a key writes a fresh
+    # random value into its slot; a cached entry is served only while its slot
+    # still holds the value read before the entry's data was loaded. Keys
+    # sharing a slot only cause extra misses.
+    def __init__(self, slots=RESPONSE_CACHE_SLOTS):
+        self.slots = slots
+        self._memory = mmap.mmap(-1, slots * 8)
+
+    def get(self, key):
+        return struct.unpack_from('Q', self._memory, self._offset(key))[0]
+
+    def bump(self, key):
+        struct.pack_into('Q', self._memory, self._offset(key), int.from_bytes(os.urandom(8), 'little'))
+
+    def _offset(self, key):
+        return zlib.crc32(key.encode('utf-8')) % self.slots * 8
+
+
+generations = GenerationTable()
+
+
+class ResponseCache():
+    # Two tiers: a per-process LRU with TTL in front of an optional shared
+    # backend. Invalidation reaches every worker process on this host at once
+    # through the generation table, and the shared tier; local tiers on other
+    # hosts converge within the local TTL, so keep that short when running
+    # several instances.
+    def __init__(self, maxsize=1024, ttl=30, shared=None, shared_ttl=300, generations=generations):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.generations = generations
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generation(self, key):
+        # Read before loading the data for set(), so an invalidation that
+        # lands in between keeps the loaded (possibly stale) data out
+        return self.generations.get(key)
+
+    def get(self, key):
+        now = time.monotonic()
+        generation = self.generations.get(key)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] > now and entry[1] == generation:
+                    self._local.move_to_end(key)
+                    return entry[2]
+                del self._local[key]
+        if self.shared is None:
+            return None
+        raw = self.shared.get(key)
+        if raw is None:
+            return None
+        response = CachedResponse.loads(raw)
+        self._put_local(key, response, generation)
+        return response
+
+    def set(self, key, response, ttl=None, generation=None):
+        # ttl shortens both tiers' lifetime for this entry, e.g. for a body
+        # read from a replica that may be behind a write just invalidated
+        current = self.generations.get(key)
+        if generation is not None and generation != current:
+            return
+        self._put_local(key, response, current, ttl)
+        if self.shared is not None:
+            self.shared.set(key, response.dumps(), min(ttl, self.shared_ttl) if ttl else self.shared_ttl)
+
+    def invalidate(self, key):
+        self.generations.bump(key)
+        with self._lock:
+            self._local.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def _put_local(self, key, response, generation, ttl=None):
+        with self._lock:
+            self._local[key] = (time.monotonic() + min(ttl or self.ttl, self.ttl), generation, response)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
@@ -0,0 +1,114 @@
+import re
+from datetime import datetime, timezone
+
+# Compiled once at import; the patterns match the ones util/validations.py used
+EMAIL_PATTERN = re.compile(r'^\w+([\.-]?\w+)*@\w+([\.-]?\w+)*(\.\w{2,3})+$')
+SUBMISSION_URL_PATTERN = re.compile(r'^(http|https):\/\/.*\.zip$')
+# Same shape strptime("%Y-%m-%dT%H:%M:%S.%f") accepted after stripping 'Z'
+DEADLINE_PATTERN = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})T(\d{1,2}):(\d{1,2}):(\d{1,2})\.(\d{1,6})Z*$')
+
+
+def parse_deadline(value):
+    # ISO-8601 with fractional seconds and a trailing 'Z'; returns an aware UTC
+    # datetime, or None when the string does not match or is out of range
+    match = DEADLINE_PATTERN.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction = match.groups()
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                        int(fraction.ljust(6, '0')), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+class Field():
+    __slots__ = ('name', 'kind', 'minimum', 'maximum', 'pattern', 'error')
+
+    def __init__(self, name, kind, error, minimum=None, maximum=None, pattern=None):
+        self.name = name
+        self.kind = kind
+        self.error = error
+        self.minimum = minimum
+        self.maximum = maximum
+        self.pattern = pattern
+
+
+class Schema():
+    # Validates a JSON object and builds `target` in a single pass over the
+    # fields. The first failing check wins; messages match the ones clients
+    # already get from the API.
+    def __init__(self, target, fields, missing, restricted, null):
+        self.target = target
+        self.fields = fields
+        self.names = frozenset(field.name for field in fields)
+        self.missing = missing
+        self.restricted = restricted
+        self.null = null
+
+    def parse(self, data):
+        if not isinstance(data, dict) or not self.names.issubset(data):
+            return None, self.missing
+        if len(data) > len(self.fields):
+            return None, self.restricted
+        if "" in data.values():
+            return None, self.null
+
+        values = []
+        for field in self.fields:
+            value = data[field.name]
+            if field.kind is str:
+                if not isinstance(value, str):
+                    return None, field.error[0]
+                if field.pattern is not None and not field.pattern.match(value):
+                    return None, field.error[1]
+            elif field.kind is int:
+                if not isinstance(value, int) or isinstance(value, bool):
+                    return None, field.error[0]
+                if not field.minimum <= value <= field.maximum:
+                    return None, field.error[1]
+            elif field.kind is datetime:
+                value = parse_deadline(value) if isinstance(value, str) else None
+                if value is None:
+                    return None, field.error[0]
+            values.append(value)
+
+        payload = self.target.__new__(self.target)
+        for field, value in zip(self.fields, values):
+            setattr(payload, field.name, value)
+        return payload, ""
+
+
+class AssignmentPayload():
+    __slots__ = ('name', 'points', 'num_of_attempts', 'deadline')
+
+
+class SubmissionPayload():
+    __slots__ = ('submission_url',)
+
+
+ASSIGNMENT_SCHEMA = Schema(
+    AssignmentPayload,
+    [
+        Field('name', str, ("Type error: Name should be string",)),
+        Field('points', int, ("Invalid type: points must be an integer",
+                              "Invalid value: points must be between 1 and 100"), 1, 100),
+        Field('num_of_attempts', int, ("Invalid type: num_of_attempts must be an integer",
+                                       "Invalid value: num_of_attempts must be between 1 and 100"), 1, 100),
+        Field('deadline', datetime, ("Invalid format: deadline must be a valid ISO 8601 datetime string with milliseconds and 'Z'",)),
+    ],
+    missing="Mandatory fields : name, points, num_of_attempts, deadline",
+    restricted="Restricted : Only name, points, num_of_attempts, deadline are allowed",
+    null="Values cannot be Null : name, points, num_of_attempts, deadline"
+)
+
+SUBMISSION_SCHEMA = Schema(
+    SubmissionPayload,
+    [
+        Field('submission_url', str, ("Type error: Submission URL should be string",
+                                      "Submission URL is not in correct format"), pattern=SUBMISSION_URL_PATTERN),
+    ],
+    missing="Mandatory field : submission_url",
+    restricted="Restricted : Only Submission URL is allowed",
+    null="Submission URL is not in correct format"
+)
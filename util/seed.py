@@ -0,0 +1,87 @@
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import insert
+from util.db import db, Users
+from util.encrypt import Encryption
+from app_logging import logger
+
+# 7 bind parameters per row; stays well under Postgres' 65535 parameter cap
+MAX_CHUNK_SIZE = 5000
+# Below this many hashes a process pool costs more to start than it saves
+POOL_THRESHOLD = 16
+
+
+class SeedError(ValueError):
+    pass
+
+
+def seed_users(file_path, chunksize=1000, workers=None):
+    # Streams the CSV in chunks. Per chunk: one set-based lookup drops emails
+    # that already exist, new passwords are hashed in parallel, and rows go in
+    # with one multi-row INSERT ... ON CONFLICT (email) DO NOTHING. Each chunk
+    # commits on its own, so re-running after a failure only fills the gaps.
+    import pandas as pd
+
+    chunksize = min(chunksize, MAX_CHUNK_SIZE)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    inserted = skipped = 0
+    pool = None
+    try:
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=str, keep_default_na=False):
+            rows = {}
+            for row in chunk.to_dict('records'):
+                if not all([row['first_name'], row['last_name'], row['email'], row['password']]):
+                    raise SeedError("Enter Valid User data")
+                if row['email'] in rows:
+                    skipped += 1
+                    continue
+                rows[row['email']] = row
+
+            existing = {email for (email,) in db.session.query(Users.email).filter(Users.email.in_(list(rows)))}
+            skipped += len(existing)
+            new_rows = [row for email, row in rows.items() if email not in existing]
+            if not new_rows:
+                continue
+
+            passwords = [row['password'] for row in new_rows]
+            if len(passwords) < POOL_THRESHOLD or workers == 1:
+                hashes = [Encryption.encrypt(p) for p in passwords]
+            else:
+                if pool is None:
+                    from concurrent.futures import ProcessPoolExecutor
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                hashes = list(pool.map(Encryption.encrypt, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+            now = datetime.now(timezone.utc)
+            values = [
+                {
+                    "id": uuid.uuid4(),
+                    "first_name": row['first_name'],
+                    "last_name": row['last_name'],
+                    "email": row['email'],
+                    "password": hashed,
+                    "account_created": now,
+                    "account_updated": now
+                }
+                for row, hashed in zip(new_rows, hashes)
+            ]
+            # RETURNING only yields rows actually written, so emails inserted
+            # concurrently by another process are counted as skipped
+            stmt = insert(Users).values(values).on_conflict_do_nothing(index_elements=['email']).returning(Users.id)
+            written = len(db.session.execute(stmt).fetchall())
+            db.session.commit()
+            inserted += written
+            skipped += len(values) - written
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    seconds = round(time.perf_counter() - started, 3)
+    logger.info(f"Seeded users from {file_path}: {inserted} inserted, {skipped} skipped in {seconds}s")
+    return {"inserted": inserted, "skipped": skipped, "seconds": seconds}
@@ -0,0 +1,80 @@
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback; output is the same, only slower
+    orjson = None
+
+
+def _default(obj):
+    # Types orjson handles natively; the stdlib encoder needs them spelled out
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def lenient_default(obj):
+    # For logs: anything unknown is written as its str()
+    try:
+        return _default(obj)
+    except TypeError:
+        return str(obj)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj, sort_keys=False, default=_default):
+        # Encodes straight to UTF-8 bytes
+        option = _OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _OPTIONS
+        return orjson.dumps(obj, default=default, option=option)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+    _sorted_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+
+    def dumps(obj, sort_keys=False, default=_default):
+        if default is not _default:
+            return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys).encode('utf-8')
+        encoder = _sorted_encoder if sort_keys else _encoder
+        return encoder.encode(obj).encode('utf-8')
+
+    loads = json.loads
+
+
+def row_dicts(rows, keys):
+    # Column-projected rows (tuples) to dicts keyed by column name, with no ORM
+    # objects in between; values are encoded by dumps as-is
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def encode_rows(rows, keys):
+    return dumps(row_dicts(rows, keys))
+
+
+class FastJSONProvider(JSONProvider):
+    # app.json provider backed by orjson when installed. jsonify() returns
+    # bytes encoded once, with datetimes, UUIDs and Decimals handled natively.
+    sort_keys = False
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self.sort_keys), mimetype=self.mimetype)
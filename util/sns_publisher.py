@@ -0,0 +1,142 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from util.clients import get_sns_client
+from util.metrics import c
+from app_logging import logger
+
+SNS_BATCH_SIZE = 10  # PublishBatch hard limit
+
+
+class PublisherFull(Exception):
+    pass
+
+
+class PublishFailed(Exception):
+    def __init__(self, code, message):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class SNSBatchPublisher():
+    # Buffers notifications from any thread and sends them with PublishBatch.
+    # A batch goes out when it holds 10 entries or when the oldest entry has
+    # waited `window` seconds. Each publish() returns a Future resolved once
+    # SNS accepts (or finally rejects) that entry.
+    def __init__(self, client=None, topic_arn=None, window=0.05, max_queue=1000,
+                 put_timeout=1.0, max_retries=3, backoff=0.2):
+        self.client = client
+        self.topic_arn = topic_arn
+        self.window = window
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def publish(self, message):
+        self._start()
+        future = Future()
+        body = json.dumps({'default': json.dumps(message)})
+        try:
+            # Backpressure: callers wait up to put_timeout for buffer space
+            self._queue.put((body, future), timeout=self.put_timeout)
+        except queue.Full:
+            c.incr('sns.publish_rejected')
+            raise PublisherFull("SNS publish buffer is full")
+        return future
+
+    def close(self, timeout=5):
+        # Flush whatever is buffered and stop the sender thread
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self._thread = None
+        self._pid = None
+
+    def _start(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="sns-publisher", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._send(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < SNS_BATCH_SIZE:
+            # Wait in short slices so close() does not sit out a long window
+            remaining = min(deadline - time.monotonic(), 0.05)
+            try:
+                if remaining > 0 and not self._stopping.is_set():
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                if deadline <= time.monotonic() or self._stopping.is_set():
+                    break
+        return batch
+
+    def _send(self, batch):
+        pending = dict(enumerate(batch))
+        for attempt in range(self.max_retries + 1):
+            entries = [
+                {'Id': str(i), 'Message': body, 'MessageStructure': 'json'}
+                for i, (body, _) in pending.items()
+            ]
+            try:
+                with c.timer('sns.publish_batch'):
+                    response = self._client().publish_batch(
+                        TopicArn=self.topic_arn or os.getenv('SNS_TOPIC_ARN'),
+                        PublishBatchRequestEntries=entries
+                    )
+            except Exception as e:
+                logger.error(f"SNS PublishBatch failed (attempt {attempt + 1}): {e}")
+                error = e
+            else:
+                error = None
+                for entry in response.get('Successful', []):
+                    _, future = pending.pop(int(entry['Id']))
+                    future.set_result(entry.get('MessageId'))
+                for entry in response.get('Failed', []):
+                    if entry.get('SenderFault'):
+                        # The request itself is wrong; retrying cannot help
+                        _, future = pending.pop(int(entry['Id']))
+                        c.incr('sns.publish_failed')
+                        future.set_exception(PublishFailed(entry.get('Code'), entry.get('Message')))
+                    else:
+                        logger.error(f"SNS entry {entry['Id']} failed: {entry.get('Code')} {entry.get('Message')}")
+            if not pending:
+                return
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        for _, future in pending.values():
+            c.incr('sns.publish_failed')
+            future.set_exception(error or PublishFailed("RetriesExhausted", "SNS kept rejecting the entry"))
+
+    def _client(self):
+        return self.client or get_sns_client()
@@ -0,0 +1,220 @@
+import json
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from util.db import db, SubmissionJobs, SubmissionAttempts
+from util.queries import Queries
+from util.url_verifier import url_verifier
+from util.sns_publisher import SNSBatchPublisher, PublishFailed
+from app_logging import logger
+
+
+class SubmissionWorker():
+    # Bounded pool of threads draining submission_jobs. Jobs are leased by
+    # pushing available_at into the future, so a job held by a crashed worker
+    # becomes claimable again once its lease runs out. A probe can outlast the
+    # lease, so the lease is renewed before publishing; the renewal only
+    # succeeds while the job's attempt count is the one this thread claimed,
+    # and a thread whose job was claimed again meanwhile publishes nothing.
+    #
+    # A thread does not wait for SNS: it hands the notification to the batch
+    # publisher and moves on to the next job, so entries from every thread
+    # share PublishBatch calls. A job is marked published only once SNS has
+    # accepted its entry, by whichever thread picks up the completion next.
+    def __init__(self, app, workers=4, poll_interval=2.0, lease=60, max_attempts=5, max_backoff=300,
+                 probe=url_verifier.verify, publisher=None):
+        self.app = app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.probe = probe
+        self.publisher = publisher or SNSBatchPublisher()
+        self._published = queue.Queue()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            # Threads do not survive fork, so a forked worker process starts its own
+            if self._pid == os.getpid() or self.workers <= 0:
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"submission-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def notify(self):
+        self.start()
+        self._wakeup.set()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._pid = None
+
+    def resolve(self, status, payload, renew=None):
+        # Probe (when still pending) and queue the notification; returns the
+        # final status and a future resolved once SNS accepts the entry. After
+        # a probe, renew() must return True for the notification to be queued;
+        # otherwise the future is None.
+        if status == "pending":
+            status = self.probe(payload["submission_url"])
+            if renew is not None and not renew():
+                return status, None
+        return status, self.publisher.publish(dict(payload, status=status))
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                with self.app.app_context():
+                    worked = self.run_once()
+            except Exception as e:
+                logger.error(f"Submission worker error: {e}")
+                worked = False
+            if not worked:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self):
+        finished = self._finish_published()
+        job = self._claim()
+        if job is None:
+            return finished
+        job_id, attempts, claimed_status, payload = job
+        try:
+            status, future = self.resolve(claimed_status, payload, lambda: self._renew(job_id, attempts))
+        except Exception as e:
+            db.session.rollback()
+            self._retry_later(job_id, e)
+            return True
+        if future is None:
+            logger.error(f"Submission job {job_id} lease expired during the URL probe; left to the thread that reclaimed it")
+            return True
+        future.add_done_callback(lambda future: self._on_published(job_id, claimed_status, status, payload, future))
+        return True
+
+    def _on_published(self, *completion):
+        # Runs on the publisher thread: queue the outcome for a worker thread,
+        # which has the app context and a session
+        self._published.put(completion)
+        self._wakeup.set()
+
+    def _finish_published(self):
+        # Records every publish that completed since the last call
+        finished = False
+        while True:
+            try:
+                job_id, claimed_status, status, payload, future = self._published.get_nowait()
+            except queue.Empty:
+                return finished
+            finished = True
+            error = future.exception()
+            if error is not None:
+                self._retry_later(job_id, error)
+                continue
+            try:
+                self._mark_published(job_id, claimed_status, status, payload)
+            except Exception as e:
+                db.session.rollback()
+                self._retry_later(job_id, e)
+
+    def _mark_published(self, job_id, claimed_status, status, payload):
+        # Jobs queued before payloads held the canonical id may carry another
+        # spelling Postgres rejects; a malformed one raises ValueError and parks
+        assign_id = str(uuid.UUID(payload["assign_id"])) if claimed_status == "pending" else None
+        updated = (SubmissionJobs.query
+                   .filter(SubmissionJobs.id == job_id, SubmissionJobs.published.is_(False))
+                   .update({"status": status, "published": True, "last_error": None}, synchronize_session=False))
+        if updated and claimed_status == "pending":
+            # Same transaction as marking the job published, so a retried
+            # job is never counted twice
+            Queries.resolve_submission(assign_id, status)
+        if updated and status in ("no_file", "too_large"):
+            # A missing or oversized file does not use up an attempt
+            (SubmissionAttempts.query
+             .filter(SubmissionAttempts.user_id == payload["user_id"],
+                     SubmissionAttempts.assignment_id == assign_id,
+                     SubmissionAttempts.attempts > 0)
+             .update({"attempts": SubmissionAttempts.attempts - 1}, synchronize_session=False))
+        db.session.commit()
+
+    def _claim(self):
+        now = datetime.now(timezone.utc)
+        job = (SubmissionJobs.query
+               .filter(SubmissionJobs.published.is_(False), SubmissionJobs.available_at <= now)
+               .order_by(SubmissionJobs.available_at)
+               .with_for_update(skip_locked=True)
+               .first())
+        if job is None:
+            db.session.rollback()
+            return None
+        job.attempts += 1
+        job.available_at = now + timedelta(seconds=self.lease)
+        claimed = (job.id, job.attempts, job.status, json.loads(job.payload))
+        db.session.commit()
+        return claimed
+
+    def _renew(self, job_id, attempts):
+        # Extends the lease unless another thread claimed the job since
+        renewed = (SubmissionJobs.query
+                   .filter(SubmissionJobs.id == job_id, SubmissionJobs.attempts == attempts,
+                           SubmissionJobs.published.is_(False))
+                   .update({"available_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease)},
+                           synchronize_session=False))
+        db.session.commit()
+        return renewed == 1
+
+    def retry_delay(self, attempts, error):
+        # Seconds until the next attempt, or None to park the job. Only errors
+        # retrying cannot fix park it; outages (SNS, database, a busy verifier
+        # or publisher) are retried for as long as they last, at most
+        # max_backoff apart.
+        if is_permanent(error) and attempts >= self.max_attempts:
+            return None
+        return min(self.max_backoff, 2 ** min(attempts, 16))
+
+    def _retry_later(self, job_id, error):
+        job = SubmissionJobs.query.filter_by(id=job_id).first()
+        if job is None:
+            return
+        job.last_error = str(error)
+        delay = self.retry_delay(job.attempts, error)
+        if delay is None:
+            # Parked: available_at NULL is never claimed again (see the
+            # requeue-submission-jobs command)
+            job.available_at = None
+            logger.error(f"Submission job {job_id} gave up after {job.attempts} attempts: {error}")
+        else:
+            job.available_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+            logger.error(f"Submission job {job_id} failed, retrying in {delay}s: {error}")
+        db.session.commit()
+
+    @staticmethod
+    def requeue_parked():
+        # Makes every parked job claimable again; returns how many
+        count = (SubmissionJobs.query
+                 .filter(SubmissionJobs.published.is_(False), SubmissionJobs.available_at.is_(None))
+                 .update({"available_at": datetime.now(timezone.utc), "attempts": 0}, synchronize_session=False))
+        db.session.commit()
+        return count
+
+
+def is_permanent(error):
+    # SNS rejected the entry itself, or the job's payload is malformed
+    if isinstance(error, PublishFailed):
+        return error.code != "RetriesExhausted"
+    return isinstance(error, (KeyError, TypeError, ValueError))
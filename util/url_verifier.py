@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from util.clients import get_http_session, http_timeout
+from util.metrics import c
+from app_logging import logger
+
+URL_VERIFY_CONCURRENCY = int(os.getenv('URL_VERIFY_CONCURRENCY', 20))
+URL_VERIFY_PER_HOST = int(os.getenv('URL_VERIFY_PER_HOST', 4))
+URL_VERIFY_MAX_BYTES = int(os.getenv('URL_VERIFY_MAX_BYTES', 100 * 1024 * 1024))
+URL_VERIFY_CACHE_SIZE = int(os.getenv('URL_VERIFY_CACHE_SIZE', 1024))
+URL_VERIFY_CACHE_TTL = float(os.getenv('URL_VERIFY_CACHE_TTL', 60))
+URL_VERIFY_WAIT = float(os.getenv('URL_VERIFY_WAIT', 10))
+
+
+class VerifierBusy(Exception):
+    # No probe slot freed up in time; the caller should retry later
+    pass
+
+
+class UrlVerifier():
+    # Checks that a submission URL points at a downloadable file without
+    # downloading it: HEAD first, then a one-byte ranged GET for servers that
+    # do not answer HEAD. Returns "valid", "no_file" or "too_large".
+    #
+    # Probes are capped globally and per host, and definitive answers are
+    # cached per URL for a short TTL. Network errors are retried and never
+    # cached.
+    def __init__(self, session=None, timeout=None, max_bytes=URL_VERIFY_MAX_BYTES,
+                 concurrency=URL_VERIFY_CONCURRENCY, per_host=URL_VERIFY_PER_HOST,
+                 cache_size=URL_VERIFY_CACHE_SIZE, cache_ttl=URL_VERIFY_CACHE_TTL,
+                 wait=URL_VERIFY_WAIT, retries=2, backoff=0.5):
+        self.session = session
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.per_host = per_host
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.wait = wait
+        self.retries = retries
+        self.backoff = backoff
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._host_slots = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, url):
+        # Deferred so importing the app does not pay for requests
+        import requests
+        status = self._cached(url)
+        if status is not None:
+            c.incr('url_verifier.cache_hit')
+            return status
+        for attempt in range(self.retries + 1):
+            try:
+                status = self._probe(url)
+            except requests.RequestException as e:
+                logger.error(f"Submission URL probe failed (attempt {attempt + 1}): {e}")
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+                continue
+            self._store(url, status)
+            return status
+        return "no_file"
+
+    async def averify(self, url):
+        # For asyncio callers; the probe runs in the loop's default executor
+        # under the same limits as sync callers
+        import asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, self.verify, url)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _probe(self, url):
+        session = self.session or get_http_session()
+        timeout = self.timeout or http_timeout()
+        if not self._slots.acquire(timeout=self.wait):
+            raise VerifierBusy("Too many URL probes in flight")
+        host = urlsplit(url).netloc
+        host_slots = self._host_slot(host)
+        try:
+            if not host_slots.acquire(timeout=self.wait):
+                raise VerifierBusy(f"Too many URL probes in flight for {urlsplit(url).hostname}")
+            try:
+                with c.timer('submission.url_probe'):
+                    return self._request(session, url, timeout)
+            finally:
+                host_slots.release()
+        finally:
+            self._release_host(host)
+            self._slots.release()
+
+    def _request(self, session, url, timeout):
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        try:
+            if response.status_code == 200:
+                return self._check_size(response.headers.get('Content-Length'))
+            if response.status_code in (404, 410):
+                return "no_file"
+        finally:
+            response.close()
+
+        # HEAD refused (405/501) or answered differently from GET, e.g. by
+        # presigned URLs: ask for the first byte only
+        response = session.get(url, headers={'Range': 'bytes=0-0'}, stream=True, timeout=timeout)
+        try:
+            if response.status_code == 206:
+                # Content-Range: bytes 0-0/<total>
+                return self._check_size(response.headers.get('Content-Range', '').rpartition('/')[2])
+            if response.status_code == 200:
+                return self._check_size(response.headers.get('Content-Length'))
+            return "no_file"
+        finally:
+            response.close()
+
+    def _check_size(self, length):
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return "too_large"
+        return "valid"
+
+    def _host_slot(self, host):
+        # Hosts are user-controlled, so a host's semaphore only lives while a
+        # probe holds or waits for it: entries are [semaphore, users]
+        with self._lock:
+            entry = self._host_slots.get(host)
+            if entry is None:
+                entry = self._host_slots[host] = [threading.BoundedSemaphore(self.per_host), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release_host(self, host):
+        with self._lock:
+            entry = self._host_slots[host]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._host_slots[host]
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._cache[url]
+                return None
+            self._cache.move_to_end(url)
+            return entry[1]
+
+    def _store(self, url, status):
+        if self.cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[url] = (time.monotonic() + self.cache_ttl, status)
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+# Shared by the submission workers of this process
+url_verifier = UrlVerifier()
@@ -1,7 +1,22 @@
 import bcrypt
+import os
 import re
 from util.db import Users, Assignments
+from util.queries import Queries
+from util.replicas import replica_reads
+from util.auth_cache import CredentialCache, register_invalidation
+from util.metrics import timed, metrics
+from util.encrypt import Encryption
+from app_logging import logger
+from util.schema import EMAIL_PATTERN
 from datetime import datetime
+
+credential_cache = CredentialCache(
+    maxsize=int(os.getenv('AUTH_CACHE_SIZE', 1024)),
+    ttl=float(os.getenv('AUTH_CACHE_TTL', 300))
+)
+register_invalidation(credential_cache, Users)
+
 class Validation():
     @staticmethod
     def isAssignDataValid(data):
@@ -42,18 +57,38 @@ class Validation():
     
     @staticmethod
     def validate_email(email):
-        # Validate the email using a regex pattern
-        pattern = r'^\w+([\.-]?\w+)*@\w+([\.-]?\w+)*(\.\w{2,3})+$'
-        if re.match(pattern, email):
+        # Validate the email using the precompiled regex pattern
+        if EMAIL_PATTERN.match(email):
             return True
         return False
     
     @staticmethod
     def validate_user(email, password):
-        user = Users.query.filter_by(email=email).first()
-        if not user or not Validation.isValidPassword(password, user.password):
-            return None
-        return user
+        # Successful bcrypt checks are cached so repeat requests with the same
+        # Authorization header skip both the user lookup and the hash
+        key = credential_cache.key(f"{email}:{password}")
+        cached = credential_cache.get(key)
+        if cached is not None:
+            return cached
+
+        with timed('auth'):
+            with replica_reads():
+                user = Queries.credentials(email)
+            if not user or not Validation.isValidPassword(password, user.password):
+                return None
+            if Encryption.needs_rehash(user.password):
+                Validation.rehash_password(user, password)
+            return credential_cache.put(key, user)
+
+    @staticmethod
+    def rehash_password(user, password):
+        # Moves a hash stored at another cost to BCRYPT_ROUNDS while the
+        # plaintext is at hand; a failure here never fails the login
+        try:
+            Queries.replace_password_hash(user.id, user.password, Encryption.encrypt(password))
+            metrics.incr('auth.rehash')
+        except Exception as e:
+            logger.error(f"Password rehash failed for user {user.id}: {e}")
     
     @staticmethod
     def validate_assign_access(email, assignment_id):
@@ -0,0 +1,3 @@
+# WSGI entry point for gunicorn (or any uWSGI-compatible server):
+#   gunicorn -c gunicorn.conf.py wsgi:application
+from app import app as application